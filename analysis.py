@@ -0,0 +1,181 @@
+import chess
+import chess.pgn
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from players import RAMZPlayer
+
+# ================= CONFIGURATION =================
+DEFAULT_ANALYSIS_DEPTH = 6       # Used when neither a depth nor a node budget is given
+DEFAULT_HASH = 16                # Transposition table size (MB) of each worker
+MAX_PENDING_PER_JOB = 4          # Positions queued per worker, so huge inputs are never read in all at once
+STATIC_BATCH_SIZE = 1024         # Positions per NumPy batch in static evaluation mode
+# =================================================
+
+# The analysing player of this process (the main one, or a pool worker), created on first use
+analysis_player = None
+
+def read_fens(stream):
+    """
+    Yields (position id, FEN) for every non-empty line of a FEN stream. Text after a FEN's sixth field
+    (e.g. an EPD id) is ignored, and the line number is used as the id
+    """
+    for line_number, line in enumerate(stream, start=1):
+        fields = line.split()
+        if fields:
+            yield str(line_number), " ".join(fields[:6])
+
+def read_pgn(stream):
+    """
+    Yields (position id, FEN) for every position in the main line of every game of a PGN stream,
+    with ids of the form "<game number>:<ply>"
+    """
+    game_number = 0
+    while True:
+        game = chess.pgn.read_game(stream)
+        if game is None:
+            return
+        game_number += 1
+        board = game.board()
+        yield f"{game_number}:0", board.fen()
+        for move in game.mainline_moves():
+            board.push(move)
+            yield f"{game_number}:{board.ply()}", board.fen()
+
+def get_analysis_player(hash_mb=DEFAULT_HASH):
+    global analysis_player
+    if analysis_player is None:
+        analysis_player = RAMZPlayer(chess.WHITE, DEFAULT_ANALYSIS_DEPTH, float("inf"), None, None, hash_mb=hash_mb)
+    return analysis_player
+
+def analyse_position(position_id, fen, depth=None, nodes=None, hash_mb=DEFAULT_HASH):
+    """
+    Analyses one position with this process's player and returns the result dict (see RAMZPlayer.analyse)
+    with the position id and FEN added. Invalid FENs yield an "error" entry instead of raising. The player is
+    reset first, so results don't depend on the positions analysed before (or on the number of jobs)
+    """
+    player = get_analysis_player(hash_mb)
+
+    try:
+        board = chess.Board(fen)
+    except ValueError as e:
+        return {'id': position_id, 'fen': fen, 'error': str(e)}
+
+    if depth is None and nodes is None:
+        depth = DEFAULT_ANALYSIS_DEPTH
+    player.new_game()
+    result = player.analyse(board, depth=depth, nodes=nodes)
+    return {'id': position_id, 'fen': fen, **result}
+
+def evaluate_static(positions, check_terminal=False, batch_size=STATIC_BATCH_SIZE):
+    """
+    Yields {'id', 'fen', 'score'} for a stream of (position id, FEN) pairs, in input order, where the score is
+    the static PeSTO evaluation from the side to move's point of view (no search). Positions are scored
+    batch_size at a time with RAMZPlayer.evaluate_batch; check_terminal also scores checkmates and draws
+    """
+    player = get_analysis_player()
+    batch = []
+    for position_id, fen in positions:
+        try:
+            batch.append((position_id, fen, chess.Board(fen), None))
+        except ValueError as e:
+            batch.append((position_id, fen, None, str(e)))
+        if len(batch) >= batch_size:
+            yield from score_static_batch(player, batch, check_terminal)
+            batch = []
+    yield from score_static_batch(player, batch, check_terminal)
+
+def score_static_batch(player, batch, check_terminal):
+    boards = [board for _, _, board, _ in batch if board is not None]
+    scores = iter(player.evaluate_batch(boards, check_terminal=check_terminal))
+    for position_id, fen, board, error in batch:
+        if board is None:
+            yield {'id': position_id, 'fen': fen, 'error': error}
+        else:
+            yield {'id': position_id, 'fen': fen, 'score': int(next(scores))}
+
+def analyse_batch(positions, depth=None, nodes=None, jobs=1, ordered=True, hash_mb=DEFAULT_HASH):
+    """
+    Analyses a stream of (position id, FEN) pairs to the given depth and/or node budget and yields one result
+    dict per position as soon as it is available. With jobs > 1 positions are spread over a process pool;
+    results then come in input order if ordered, else in completion order. Only a few positions per worker
+    are read ahead, so the input can be an arbitrarily long generator
+    """
+    if jobs <= 1:
+        for position_id, fen in positions:
+            yield analyse_position(position_id, fen, depth, nodes, hash_mb)
+        return
+
+    max_pending = jobs * MAX_PENDING_PER_JOB
+    positions = iter(positions)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = {}        # future -> input index
+        finished = {}       # input index -> result, held back until all earlier positions are done
+        next_index = 0      # Index of the next position to submit
+        next_to_yield = 0   # Index of the next result to yield (ordered mode)
+        exhausted = False
+
+        while True:
+            # Keeping the pool topped up. In ordered mode finished results wait for the oldest position, so the
+            # limit counts everything since that one, not just the running positions
+            while not exhausted and len(pending) < max_pending and (not ordered or next_index - next_to_yield < max_pending):
+                try:
+                    position_id, fen = next(positions)
+                except StopIteration:
+                    exhausted = True
+                    break
+                future = pool.submit(analyse_position, position_id, fen, depth, nodes, hash_mb)
+                pending[future] = next_index
+                next_index += 1
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                if ordered:
+                    finished[index] = future.result()
+                else:
+                    yield future.result()
+
+            while next_to_yield in finished:
+                yield finished.pop(next_to_yield)
+                next_to_yield += 1
+
+def main():
+    parser = argparse.ArgumentParser(description="RAM-Z Batch Analysis: evaluates positions and writes JSON lines")
+    parser.add_argument('input', type=str, help="File with one FEN per line, or a PGN file with --pgn ('-' reads stdin)")
+    parser.add_argument('--pgn', action='store_true', help="Read the input as PGN and analyse every position of every game")
+    parser.add_argument('--depth', type=int, default=None, help=f"Search depth per position (default: {DEFAULT_ANALYSIS_DEPTH} if no --nodes)")
+    parser.add_argument('--nodes', type=int, default=None, help="Node budget per position")
+    parser.add_argument('--jobs', type=int, default=1, help="Number of positions analysed in parallel")
+    parser.add_argument('--hash', type=int, default=DEFAULT_HASH, help="Transposition table size (MB) per worker")
+    parser.add_argument('--unordered', action='store_true', help="Write results as they finish instead of in input order")
+    parser.add_argument('--static', action='store_true', help="Only compute the static evaluation of every position (no search), in NumPy batches")
+    parser.add_argument('--terminal', action='store_true', help="With --static, also score checkmates and draws (much slower)")
+    parser.add_argument('--out', type=str, default=None, help="Output JSONL file (default: stdout)")
+    args = parser.parse_args()
+
+    stream = sys.stdin if args.input == '-' else open(args.input)
+    out = sys.stdout if args.out is None else open(args.out, 'w')
+    try:
+        positions = read_pgn(stream) if args.pgn else read_fens(stream)
+        if args.static:
+            results = evaluate_static(positions, args.terminal)
+        else:
+            results = analyse_batch(positions, args.depth, args.nodes, args.jobs, not args.unordered, args.hash)
+        for count, result in enumerate(results, start=1):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            if args.out is not None and count % 100 == 0:
+                print(f"Analysed {count} positions")
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import chess
+import argparse
+import json
+import time
+from players import RAMZPlayer
+
+# ================= CONFIGURATION =================
+DEFAULT_BENCH_DEPTH = 6          # Fixed search depth for every position
+DEFAULT_HASH = 16                # Transposition table size (MB)
+
+# Fixed benchmark positions: (name, FEN). Changing this list changes the node signature
+BENCH_POSITIONS = [
+    ("startpos",        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"),
+    ("italian",         "r1bqk1nr/pppp1ppp/2n5/2b1p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4"),
+    ("qgd",             "r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP3PPP/R2QKB1R w KQ - 0 9"),
+    ("sicilian",        "r1b1kb1r/1pqp1ppp/p1n1pn2/8/3NP3/2N1B3/PPP1BPPP/R2QK2R w KQkq - 2 8"),
+    ("kiwipete",        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"),
+    ("tactical-1",      "r1bq2r1/b4pk1/p1pp1p2/1p2pP2/1P2P1PB/3P4/1PPQ2P1/R3K2R w - - 0 1"),
+    ("tactical-2",      "2r3k1/pp3ppp/2n1b3/3pP3/3P4/1B6/PP3PPP/2R3K1 w - - 0 1"),
+    ("middlegame",      "r2q1rk1/pp1bbppp/2n1pn2/3p4/3P4/2NBPN2/PP1B1PPP/R2Q1RK1 w - - 0 10"),
+    ("rook-endgame",    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1"),
+    ("pawn-endgame",    "8/8/1p3k2/p1p2p2/P1P2P2/1P3K2/8/8 w - - 0 1"),
+    ("minor-endgame",   "8/5k2/3b4/8/2N5/5K2/3P4/8 w - - 0 1"),
+    ("queen-endgame",   "6k1/5pp1/7p/8/8/6PP/5PK1/3q3Q b - - 0 1"),
+]
+# =================================================
+
+def bench_position(name, fen, depth, hash_mb):
+    """
+    Searches one position to a fixed depth with a fresh player (empty transposition table and history),
+    so every position's node count is independent of the others. Returns the result as a dict
+    """
+    board = chess.Board(fen)
+    player = RAMZPlayer(
+        mycolor=board.turn,
+        depth_limit=depth,
+        time_limit=float("inf"),
+        opening_book_path=None,
+        syzygy_path=None,
+        hash_mb=hash_mb,
+        stats=True
+    )
+    start_time = time.perf_counter()
+    best_move = player.make_move(board)
+    elapsed = time.perf_counter() - start_time
+    player.close()
+
+    return {
+        "name": name,
+        "fen": fen,
+        "best_move": best_move.uci() if best_move else None,
+        "score": player.stats.iterations[-1]["score"] if player.stats.iterations else None,
+        "nodes": player.nodes,
+        "qnodes": player.stats.qnodes,
+        "time": elapsed,
+        "nps": int(player.nodes / elapsed) if elapsed > 0 else 0,
+    }
+
+def run_bench(depth=DEFAULT_BENCH_DEPTH, hash_mb=DEFAULT_HASH, positions=BENCH_POSITIONS, verbose=True):
+    """
+    Benchmarks every position and returns a summary dict. The signature (total node count) only depends on the
+    search itself, so any change in it means the search behaves differently; nps and time measure speed
+    """
+    results = []
+    for name, fen in positions:
+        result = bench_position(name, fen, depth, hash_mb)
+        results.append(result)
+        if verbose:
+            print(f"{name:<16} {result['best_move'] or '-':<6} nodes {result['nodes']:>9}  "
+                  f"time {result['time']:>7.2f}s  nps {result['nps']:>7}")
+
+    total_nodes = sum(result["nodes"] for result in results)
+    total_time = sum(result["time"] for result in results)
+    return {
+        "depth": depth,
+        "hash_mb": hash_mb,
+        "positions": results,
+        "nodes": total_nodes,
+        "time": total_time,
+        "nps": int(total_nodes / total_time) if total_time > 0 else 0,
+        "signature": total_nodes,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="RAM-Z Benchmark: fixed-depth search over a fixed set of positions")
+    parser.add_argument('--depth', type=int, default=DEFAULT_BENCH_DEPTH, help="Search depth for every position")
+    parser.add_argument('--hash', type=int, default=DEFAULT_HASH, help="Transposition table size (MB)")
+    parser.add_argument('--json', type=str, default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    print(f"--- RAM-Z BENCH: {len(BENCH_POSITIONS)} positions | Depth: {args.depth} | Hash: {args.hash} MB ---")
+    summary = run_bench(args.depth, args.hash)
+
+    print("===============================================")
+    print(f"Total time (s) : {summary['time']:.2f}")
+    print(f"Nodes searched : {summary['nodes']}")
+    print(f"Nodes/second   : {summary['nps']}")
+    print(f"Signature      : {summary['signature']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Saved {args.json}")
+
+if __name__ == "__main__":
+    main()
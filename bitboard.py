@@ -0,0 +1,498 @@
+import chess
+
+# --- 1. Precomputed attack tables ---
+
+# Leaper attacks indexed by square (pawn attacks by color, then square). Slider attacks are looked up by square
+# and the occupancy of the rank / file / diagonals through it, masked with the matching *_MASKS entry
+KNIGHT_ATTACKS = chess.BB_KNIGHT_ATTACKS
+KING_ATTACKS = chess.BB_KING_ATTACKS
+PAWN_ATTACKS = chess.BB_PAWN_ATTACKS
+RANK_ATTACKS, RANK_MASKS = chess.BB_RANK_ATTACKS, chess.BB_RANK_MASKS
+FILE_ATTACKS, FILE_MASKS = chess.BB_FILE_ATTACKS, chess.BB_FILE_MASKS
+DIAG_ATTACKS, DIAG_MASKS = chess.BB_DIAG_ATTACKS, chess.BB_DIAG_MASKS
+
+SQUARES = chess.BB_SQUARES
+BB_ALL = chess.BB_ALL
+# LINE[a][b]: the full line through a and b (0 if they are not on a common rank, file or diagonal)
+LINE = chess.BB_RAYS
+# BETWEEN[a][b]: the squares strictly between a and b on that line
+BETWEEN = [[chess.between(a, b) for b in range(64)] for a in range(64)]
+
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN, chess.KING
+PROMOTION_PIECES = (QUEEN, ROOK, BISHOP, KNIGHT)  # Same order as python-chess generates them
+Move = chess.Move
+
+# Castling (standard chess only), keyed by the rook's starting square:
+# (king from, king to, rook to, squares that must be empty, squares the king passes that must not be attacked)
+CASTLING = {
+    chess.H1: (chess.E1, chess.G1, chess.F1, chess.BB_F1 | chess.BB_G1, (chess.F1, chess.G1)),
+    chess.A1: (chess.E1, chess.C1, chess.D1, chess.BB_B1 | chess.BB_C1 | chess.BB_D1, (chess.D1, chess.C1)),
+    chess.H8: (chess.E8, chess.G8, chess.F8, chess.BB_F8 | chess.BB_G8, (chess.F8, chess.G8)),
+    chess.A8: (chess.E8, chess.C8, chess.D8, chess.BB_B8 | chess.BB_C8 | chess.BB_D8, (chess.D8, chess.C8)),
+}
+BACKRANK = [chess.BB_RANK_8, chess.BB_RANK_1]          # Indexed by color
+EP_CAPTURER_RANK = [chess.BB_RANK_4, chess.BB_RANK_5]  # Rank of pawns that can capture en passant, by color
+
+# --- 2. Search board ---
+
+class SearchBoard():
+    """
+    Lean board for the search core. Holds one bitboard per piece type (bb[piece type]), one per color and
+    a 64-square mailbox of piece types, and makes / unmakes moves by XOR-ing them, saving only a small
+    tuple of irreversible state per move. Moves are ordinary chess.Move objects.
+
+    It mirrors the part of the chess.Board interface the search uses (same attribute names, same move
+    generation order), so it is created from a chess.Board at the root of the search and converted back
+    with to_board() where a real chess.Board is needed (tablebase probes). Standard chess only.
+    """
+    __slots__ = ('bb', 'occupied_co', 'occupied', 'mailbox', 'turn', 'castling_rights', 'ep_square',
+                 'halfmove_clock', 'fullmove_number', 'move_stack', 'state_stack')
+
+    def __init__(self, board):
+        self.bb = [0, board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings]
+        self.occupied_co = [board.occupied_co[chess.BLACK], board.occupied_co[chess.WHITE]]
+        self.occupied = board.occupied
+        self.mailbox = [board.piece_type_at(square) or 0 for square in range(64)]
+        self.turn = board.turn
+        self.castling_rights = board.clean_castling_rights()
+        self.ep_square = board.ep_square
+        self.halfmove_clock = board.halfmove_clock
+        self.fullmove_number = board.fullmove_number
+        self.move_stack = []
+        self.state_stack = []  # (castling rights, ep square, halfmove clock, captured piece type) per move
+
+    def to_board(self):
+        """
+        Returns the current position as a chess.Board (without move history)
+        """
+        board = chess.Board(None)
+        board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings = self.bb[1:]
+        board.occupied_co = [self.occupied_co[chess.BLACK], self.occupied_co[chess.WHITE]]
+        board.occupied = self.occupied
+        board.promoted = 0
+        board.turn = self.turn
+        board.castling_rights = self.castling_rights
+        board.ep_square = self.ep_square
+        board.halfmove_clock = self.halfmove_clock
+        board.fullmove_number = self.fullmove_number
+        return board
+
+    # --- Piece access ---
+
+    @property
+    def pawns(self):
+        return self.bb[PAWN]
+
+    @property
+    def knights(self):
+        return self.bb[KNIGHT]
+
+    @property
+    def bishops(self):
+        return self.bb[BISHOP]
+
+    @property
+    def rooks(self):
+        return self.bb[ROOK]
+
+    @property
+    def queens(self):
+        return self.bb[QUEEN]
+
+    @property
+    def kings(self):
+        return self.bb[KING]
+
+    def piece_type_at(self, square):
+        return self.mailbox[square] or None
+
+    def pieces_mask(self, piece_type, color):
+        return self.bb[piece_type] & self.occupied_co[color]
+
+    def king(self, color):
+        king_mask = self.bb[KING] & self.occupied_co[color]
+        return king_mask.bit_length() - 1 if king_mask else None
+
+    # --- Attacks ---
+
+    def attackers_mask(self, color, square, occupied=None):
+        """
+        Pieces of the given color attacking a square, with sliders blocked by the given occupancy
+        (default: the board's). As in python-chess, pieces missing from that occupancy are not removed
+        """
+        if occupied is None:
+            occupied = self.occupied
+        bb = self.bb
+        queens = bb[QUEEN]
+        attackers = (
+            (KNIGHT_ATTACKS[square] & bb[KNIGHT]) |
+            (KING_ATTACKS[square] & bb[KING]) |
+            (PAWN_ATTACKS[not color][square] & bb[PAWN]) |
+            ((RANK_ATTACKS[square][RANK_MASKS[square] & occupied] |
+              FILE_ATTACKS[square][FILE_MASKS[square] & occupied]) & (bb[ROOK] | queens)) |
+            (DIAG_ATTACKS[square][DIAG_MASKS[square] & occupied] & (bb[BISHOP] | queens))
+        )
+        return attackers & self.occupied_co[color]
+
+    def is_check(self):
+        king_mask = self.bb[KING] & self.occupied_co[self.turn]
+        return bool(king_mask and self.attackers_mask(not self.turn, king_mask.bit_length() - 1))
+
+    def slider_blockers(self, king):
+        """
+        Pieces of the side to move pinned to its king (the only piece between the king and an enemy slider)
+        """
+        bb = self.bb
+        queens = bb[QUEEN]
+        snipers = (((RANK_ATTACKS[king][0] | FILE_ATTACKS[king][0]) & (bb[ROOK] | queens)) |
+                   (DIAG_ATTACKS[king][0] & (bb[BISHOP] | queens))) & self.occupied_co[not self.turn]
+        occupied = self.occupied
+        between = BETWEEN[king]
+        blockers = 0
+        while snipers:
+            sniper = snipers.bit_length() - 1
+            snipers ^= SQUARES[sniper]
+            b = between[sniper] & occupied
+            if b and not b & (b - 1):
+                blockers |= b
+        return blockers & self.occupied_co[self.turn]
+
+    # --- Move classification ---
+
+    def is_capture(self, move):
+        return bool(SQUARES[move.to_square] & self.occupied_co[not self.turn]) or self.is_en_passant(move)
+
+    def is_en_passant(self, move):
+        return (move.to_square == self.ep_square and self.mailbox[move.from_square] == PAWN
+                and abs(move.to_square - move.from_square) in (7, 9) and not SQUARES[move.to_square] & self.occupied)
+
+    def is_castling(self, move):
+        return self.mailbox[move.from_square] == KING and abs(move.to_square - move.from_square) == 2
+
+    # --- Move generation ---
+
+    def generate_legal_moves(self, from_mask=BB_ALL, to_mask=BB_ALL):
+        """
+        Yields the legal moves from squares in from_mask to squares in to_mask, in the same order as
+        chess.Board.generate_legal_moves. Pins restrict a piece to the line through its king, checks restrict
+        the other pieces to capturing or blocking the single checker, and king moves are tested against
+        the board without the king (so it can't step back along a checking line)
+        """
+        us = self.turn
+        them = not us
+        bb = self.bb
+        mailbox = self.mailbox
+        occupied = self.occupied
+        ours = self.occupied_co[us]
+        theirs = self.occupied_co[them]
+        king_mask = bb[KING] & ours
+        king = king_mask.bit_length() - 1
+        checkers = self.attackers_mask(them, king)
+        blockers = self.slider_blockers(king)
+        king_line = LINE[king]
+        target = to_mask & ~ours
+
+        def king_moves():
+            moves = KING_ATTACKS[king] & target
+            occupied_without_king = occupied ^ king_mask
+            while moves:
+                to_square = moves.bit_length() - 1
+                moves ^= SQUARES[to_square]
+                if not self.attackers_mask(them, to_square, occupied_without_king):
+                    yield Move(king, to_square)
+
+        if checkers:
+            # Evasions: king moves first, then (against a single checker) captures and blocks
+            if king_mask & from_mask:
+                yield from king_moves()
+            if checkers & (checkers - 1):
+                return
+            checker = checkers.bit_length() - 1
+            target &= BETWEEN[king][checker] | checkers
+            from_mask &= ~king_mask
+
+        # Piece moves (including the king's when not in check), from the highest square down
+        pieces = ours & ~bb[PAWN] & from_mask
+        while pieces:
+            from_square = pieces.bit_length() - 1
+            pieces ^= SQUARES[from_square]
+            if from_square == king:
+                yield from king_moves()
+                continue
+
+            piece_type = mailbox[from_square]
+            if piece_type == KNIGHT:
+                moves = KNIGHT_ATTACKS[from_square]
+            elif piece_type == BISHOP:
+                moves = DIAG_ATTACKS[from_square][DIAG_MASKS[from_square] & occupied]
+            elif piece_type == ROOK:
+                moves = (RANK_ATTACKS[from_square][RANK_MASKS[from_square] & occupied] |
+                         FILE_ATTACKS[from_square][FILE_MASKS[from_square] & occupied])
+            else:
+                moves = (RANK_ATTACKS[from_square][RANK_MASKS[from_square] & occupied] |
+                         FILE_ATTACKS[from_square][FILE_MASKS[from_square] & occupied] |
+                         DIAG_ATTACKS[from_square][DIAG_MASKS[from_square] & occupied])
+            moves &= target
+            if blockers & SQUARES[from_square]:
+                moves &= king_line[from_square]
+            while moves:
+                to_square = moves.bit_length() - 1
+                moves ^= SQUARES[to_square]
+                yield Move(from_square, to_square)
+
+        # Castling (never out of check), kingside first
+        if not checkers and king_mask & from_mask:
+            rights = self.castling_rights & BACKRANK[us]
+            while rights:
+                rook_square = rights.bit_length() - 1
+                rights ^= SQUARES[rook_square]
+                king_from, king_to, _, empty, passed = CASTLING[rook_square]
+                if (king == king_from and not occupied & empty and SQUARES[king_to] & to_mask
+                        and not self.attackers_mask(them, passed[0]) and not self.attackers_mask(them, passed[1])):
+                    yield Move(king, king_to)
+
+        pawns = bb[PAWN] & ours & from_mask
+        if not pawns:
+            return
+
+        # Pawn captures
+        capturers = pawns
+        pawn_attacks = PAWN_ATTACKS[us]
+        while capturers:
+            from_square = capturers.bit_length() - 1
+            capturers ^= SQUARES[from_square]
+            moves = pawn_attacks[from_square] & theirs & target
+            if blockers & SQUARES[from_square]:
+                moves &= king_line[from_square]
+            while moves:
+                to_square = moves.bit_length() - 1
+                moves ^= SQUARES[to_square]
+                if to_square < 8 or to_square >= 56:
+                    for promotion in PROMOTION_PIECES:
+                        yield Move(from_square, to_square, promotion)
+                else:
+                    yield Move(from_square, to_square)
+
+        # Pawn advances
+        empty = ~occupied
+        if us:
+            single_moves = pawns << 8 & empty
+            double_moves = single_moves << 8 & empty & chess.BB_RANK_4
+            step = -8
+        else:
+            single_moves = pawns >> 8 & empty
+            double_moves = single_moves >> 8 & empty & chess.BB_RANK_5
+            step = 8
+        single_moves &= target
+        double_moves &= target
+
+        while single_moves:
+            to_square = single_moves.bit_length() - 1
+            single_moves ^= SQUARES[to_square]
+            from_square = to_square + step
+            if blockers & SQUARES[from_square] and not king_line[from_square] & SQUARES[to_square]:
+                continue
+            if to_square < 8 or to_square >= 56:
+                for promotion in PROMOTION_PIECES:
+                    yield Move(from_square, to_square, promotion)
+            else:
+                yield Move(from_square, to_square)
+
+        while double_moves:
+            to_square = double_moves.bit_length() - 1
+            double_moves ^= SQUARES[to_square]
+            from_square = to_square + 2 * step
+            if blockers & SQUARES[from_square] and not king_line[from_square] & SQUARES[to_square]:
+                continue
+            yield Move(from_square, to_square)
+
+        # En passant: checked by looking for attacks on the king with both pawns gone (covers pins,
+        # rank skewers and whether it deals with a check)
+        yield from self.generate_legal_ep(from_mask, to_mask)
+
+    def generate_legal_ep(self, from_mask=BB_ALL, to_mask=BB_ALL):
+        ep_square = self.ep_square
+        if ep_square is None or not SQUARES[ep_square] & to_mask or SQUARES[ep_square] & self.occupied:
+            return
+        us = self.turn
+        capturers = (self.bb[PAWN] & self.occupied_co[us] & from_mask &
+                     PAWN_ATTACKS[not us][ep_square] & EP_CAPTURER_RANK[us])
+        if not capturers:
+            return
+
+        king = self.king(us)
+        captured_mask = SQUARES[ep_square - 8 if us else ep_square + 8]
+        while capturers:
+            from_square = capturers.bit_length() - 1
+            capturers ^= SQUARES[from_square]
+            occupied = (self.occupied ^ SQUARES[from_square] ^ captured_mask) | SQUARES[ep_square]
+            if not self.attackers_mask(not us, king, occupied) & occupied:
+                yield Move(from_square, ep_square)
+
+    def generate_legal_captures(self, from_mask=BB_ALL, to_mask=BB_ALL):
+        yield from self.generate_legal_moves(from_mask, to_mask & self.occupied_co[not self.turn])
+        yield from self.generate_legal_ep(from_mask, to_mask)
+
+    @property
+    def legal_moves(self):
+        return self.generate_legal_moves()
+
+    def is_legal(self, move):
+        if not move or move.drop:
+            return False
+        return move in self.generate_legal_moves(SQUARES[move.from_square], SQUARES[move.to_square])
+
+    # --- Make / unmake ---
+
+    def push(self, move):
+        """
+        Plays a move (or a null move), saving the irreversible state needed by pop()
+        """
+        us = self.turn
+        them = not us
+        self.move_stack.append(move)
+        ep_square = self.ep_square
+        self.ep_square = None
+        self.halfmove_clock += 1
+        if not us:
+            self.fullmove_number += 1
+        self.turn = them
+
+        if not move:
+            self.state_stack.append((self.castling_rights, ep_square, self.halfmove_clock - 1, 0))
+            return
+
+        bb = self.bb
+        mailbox = self.mailbox
+        occupied_co = self.occupied_co
+        from_square = move.from_square
+        to_square = move.to_square
+        from_mask = SQUARES[from_square]
+        to_mask = SQUARES[to_square]
+        piece_type = mailbox[from_square]
+        captured = mailbox[to_square]
+        self.state_stack.append((self.castling_rights, ep_square, self.halfmove_clock - 1, captured))
+
+        if captured:
+            bb[captured] ^= to_mask
+            occupied_co[them] ^= to_mask
+            self.halfmove_clock = 0
+
+        # Moving the piece (promotions arrive as the new piece)
+        new_type = move.promotion or piece_type
+        bb[piece_type] ^= from_mask
+        bb[new_type] ^= to_mask
+        occupied_co[us] ^= from_mask | to_mask
+        mailbox[from_square] = 0
+        mailbox[to_square] = new_type
+
+        if piece_type == PAWN:
+            self.halfmove_clock = 0
+            diff = to_square - from_square
+            if diff == 16 or diff == -16:
+                self.ep_square = from_square + diff // 2
+            elif to_square == ep_square and not captured:
+                # En passant: the captured pawn stands behind the target square
+                captured_square = to_square - 8 if us else to_square + 8
+                bb[PAWN] ^= SQUARES[captured_square]
+                occupied_co[them] ^= SQUARES[captured_square]
+                mailbox[captured_square] = 0
+        elif piece_type == KING:
+            self.castling_rights &= ~BACKRANK[us]
+            if to_square - from_square == 2 or from_square - to_square == 2:
+                rook_from = to_square + 1 if to_square > from_square else to_square - 2
+                rook_to = CASTLING[rook_from][2]
+                rook_mask = SQUARES[rook_from] | SQUARES[rook_to]
+                bb[ROOK] ^= rook_mask
+                occupied_co[us] ^= rook_mask
+                mailbox[rook_from] = 0
+                mailbox[rook_to] = ROOK
+
+        self.castling_rights &= ~(from_mask | to_mask)
+        self.occupied = occupied_co[0] | occupied_co[1]
+
+    def pop(self):
+        """
+        Takes back the last move (or null move) and returns it
+        """
+        move = self.move_stack.pop()
+        self.castling_rights, ep_square, self.halfmove_clock, captured = self.state_stack.pop()
+        self.ep_square = ep_square
+        them = self.turn
+        us = not them
+        self.turn = us
+        if not us:
+            self.fullmove_number -= 1
+
+        if not move:
+            return move
+
+        bb = self.bb
+        mailbox = self.mailbox
+        occupied_co = self.occupied_co
+        from_square = move.from_square
+        to_square = move.to_square
+        from_mask = SQUARES[from_square]
+        to_mask = SQUARES[to_square]
+        new_type = mailbox[to_square]
+        piece_type = PAWN if move.promotion else new_type
+
+        bb[new_type] ^= to_mask
+        bb[piece_type] ^= from_mask
+        occupied_co[us] ^= from_mask | to_mask
+        mailbox[from_square] = piece_type
+        mailbox[to_square] = captured
+
+        if captured:
+            bb[captured] ^= to_mask
+            occupied_co[them] ^= to_mask
+        elif piece_type == PAWN and to_square == ep_square:
+            captured_square = to_square - 8 if us else to_square + 8
+            bb[PAWN] ^= SQUARES[captured_square]
+            occupied_co[them] ^= SQUARES[captured_square]
+            mailbox[captured_square] = PAWN
+        elif piece_type == KING and (to_square - from_square == 2 or from_square - to_square == 2):
+            rook_from = to_square + 1 if to_square > from_square else to_square - 2
+            rook_to = CASTLING[rook_from][2]
+            rook_mask = SQUARES[rook_from] | SQUARES[rook_to]
+            bb[ROOK] ^= rook_mask
+            occupied_co[us] ^= rook_mask
+            mailbox[rook_from] = ROOK
+            mailbox[rook_to] = 0
+
+        self.occupied = occupied_co[0] | occupied_co[1]
+        return move
+
+    # --- Draw rules ---
+
+    def has_insufficient_material(self, color):
+        """
+        Same rules as chess.Board.has_insufficient_material: can the given color never deliver mate?
+        """
+        bb = self.bb
+        ours = self.occupied_co[color]
+        if ours & (bb[PAWN] | bb[ROOK] | bb[QUEEN]):
+            return False
+        if ours & bb[KNIGHT]:
+            return chess.popcount(ours) <= 2 and not (self.occupied_co[not color] & ~bb[KING] & ~bb[QUEEN])
+        if ours & bb[BISHOP]:
+            bishops = bb[BISHOP]
+            same_color = not bishops & chess.BB_DARK_SQUARES or not bishops & chess.BB_LIGHT_SQUARES
+            return same_color and not bb[PAWN] and not bb[KNIGHT]
+        return True
+
+    def is_insufficient_material(self):
+        return self.has_insufficient_material(chess.WHITE) and self.has_insufficient_material(chess.BLACK)
+
+def perft(board, depth):
+    """
+    Counts the leaf nodes of the legal move tree to the given depth (board is a SearchBoard)
+    """
+    if depth <= 1:
+        return sum(1 for _ in board.generate_legal_moves()) if depth == 1 else 1
+    nodes = 0
+    for move in list(board.generate_legal_moves()):
+        board.push(move)
+        nodes += perft(board, depth - 1)
+        board.pop()
+    return nodes
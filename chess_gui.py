@@ -79,6 +79,7 @@ parser.add_argument(
 parser.add_argument('--depth', type=int, default=4, help="Depth limit for RAMZPlayer (default: 4)")
 parser.add_argument('--time', type=float, default=5.0, help="Time limit in seconds per move (default: 5.0)")
 parser.add_argument('--elo', type=int, default=1600, help="Elo rating for Stockfish (default: 1500)")
+parser.add_argument('--ponder', action='store_true', help="Let RAMZPlayer think on your time")
 
 args = parser.parse_args()
 
@@ -103,7 +104,8 @@ elif args.agent == 'ramz':
         depth_limit=args.depth, 
         time_limit=args.time, 
         opening_book_path="opening_books/gm2600.bin", 
-        syzygy_path=None
+        syzygy_path=None,
+        ponder=args.ponder
     )
 
 elif args.agent == 'stockfish':
@@ -128,7 +130,8 @@ elif args.agent == 'stockfish':
             depth_limit=args.depth, 
             time_limit=args.time, 
             opening_book_path="opening_books/gm2600.bin", 
-            syzygy_path=None
+            syzygy_path=None,
+            ponder=args.ponder
         )
 
 # Setting parameter values
@@ -0,0 +1,142 @@
+import chess
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from bitboard import SearchBoard, perft
+
+# ================= CONFIGURATION =================
+DEFAULT_PERFT_DEPTH = 4
+
+# Standard perft positions: name -> (FEN, known node counts for depth 1, 2, 3, ...)
+PERFT_POSITIONS = {
+    "startpos": ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+                 [20, 400, 8902, 197281, 4865609]),
+    "kiwipete": ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+                 [48, 2039, 97862, 4085603]),
+    "endgame":  ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+                 [14, 191, 2812, 43238, 674624]),
+    "promotions": ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+                   [6, 264, 9467, 422333]),
+    "talkchess": ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+                  [44, 1486, 62379, 2103487]),
+    "middlegame": ("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+                   [46, 2079, 89890, 3894594]),
+}
+# =================================================
+
+def chess_board_perft(board, depth):
+    """
+    Same count as bitboard.perft, on a python-chess Board (for comparison)
+    """
+    if depth <= 1:
+        return sum(1 for _ in board.generate_legal_moves()) if depth == 1 else 1
+    nodes = 0
+    for move in list(board.generate_legal_moves()):
+        board.push(move)
+        nodes += chess_board_perft(board, depth - 1)
+        board.pop()
+    return nodes
+
+def make_board(fen, board_type):
+    board = chess.Board(fen)
+    return SearchBoard(board) if board_type == "searchboard" else board
+
+def perft_after(fen, move_uci, depth, board_type):
+    """
+    Perft of the position after one root move (the unit of work for divide and for the process pool)
+    """
+    board = make_board(fen, board_type)
+    board.push(chess.Move.from_uci(move_uci))
+    count = perft if board_type == "searchboard" else chess_board_perft
+    return count(board, depth - 1)
+
+def divide(fen, depth, board_type="searchboard", jobs=1):
+    """
+    Returns [(root move in UCI, node count below it)] for a perft of at least depth 1, split over
+    a process pool by root move when jobs > 1
+    """
+    root_moves = [move.uci() for move in make_board(fen, board_type).generate_legal_moves()]
+    if jobs <= 1:
+        counts = [perft_after(fen, move, depth, board_type) for move in root_moves]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            counts = list(pool.map(perft_after, [fen] * len(root_moves), root_moves,
+                                   [depth] * len(root_moves), [board_type] * len(root_moves)))
+    return list(zip(root_moves, counts))
+
+def run_perft(name, fen, depth, board_type="searchboard", jobs=1, show_divide=False, expected=None):
+    """
+    Runs and prints one perft (checked against the expected count, if given). Returns (nodes, seconds)
+    """
+    start_time = time.perf_counter()
+    if jobs > 1 or show_divide:
+        results = divide(fen, depth, board_type, jobs)
+        nodes = sum(count for _, count in results)
+    else:
+        results = None
+        count = perft if board_type == "searchboard" else chess_board_perft
+        nodes = count(make_board(fen, board_type), depth)
+    elapsed = time.perf_counter() - start_time
+
+    if show_divide:
+        for move, count in results:
+            print(f"  {move}: {count}")
+
+    if expected is None:
+        status = ""
+    elif nodes == expected:
+        status = "OK"
+    else:
+        status = f"MISMATCH (expected {expected})"
+    nps = int(nodes / elapsed) if elapsed > 0 else 0
+    print(f"{name:<12} depth {depth}  nodes {nodes:>10}  time {elapsed:>7.2f}s  nps {nps:>9}  {status}")
+    return nodes, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Perft: move generation correctness and throughput")
+    parser.add_argument('--position', type=str, default='all', choices=['all'] + list(PERFT_POSITIONS),
+                        help="Standard position to run (default: all)")
+    parser.add_argument('--fen', type=str, default=None, help="Run a custom position instead (no known counts)")
+    parser.add_argument('--depth', type=int, default=DEFAULT_PERFT_DEPTH,
+                        help="Perft depth (capped at the deepest known count for standard positions)")
+    parser.add_argument('--divide', action='store_true', help="Print the node count below every root move")
+    parser.add_argument('--jobs', type=int, default=1, help="Processes to split the root moves over")
+    parser.add_argument('--board', type=str, default='searchboard', choices=['searchboard', 'python-chess'],
+                        help="Board implementation to measure (default: the search's SearchBoard)")
+    args = parser.parse_args()
+    if args.depth < 1:
+        parser.error("--depth must be at least 1")
+
+    # (name, FEN, depth, expected count)
+    if args.fen:
+        positions = [("custom", args.fen, args.depth, None)]
+    else:
+        names = list(PERFT_POSITIONS) if args.position == 'all' else [args.position]
+        positions = []
+        for name in names:
+            fen, counts = PERFT_POSITIONS[name]
+            depth = min(args.depth, len(counts))
+            positions.append((name, fen, depth, counts[depth - 1]))
+
+    print(f"--- PERFT: {args.board} | Depth: {args.depth} | Jobs: {args.jobs} ---")
+    total_nodes = 0
+    total_time = 0.0
+    all_ok = True
+    for name, fen, depth, expected in positions:
+        nodes, elapsed = run_perft(name, fen, depth, args.board, args.jobs, args.divide, expected)
+        total_nodes += nodes
+        total_time += elapsed
+        all_ok &= expected is None or nodes == expected
+
+    if len(positions) > 1:
+        print("===============================================")
+        print(f"Total nodes    : {total_nodes}")
+        print(f"Nodes/second   : {int(total_nodes / total_time) if total_time > 0 else 0}")
+        print("All counts match" if all_ok else "COUNT MISMATCH")
+
+    if not all_ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,13 @@ import random
 import chess.syzygy
 import time
 import chess.engine
+import multiprocessing
+import queue
+import json
+import sys
+import threading
+import numpy as np
+from bitboard import SearchBoard
 
 # --- 1. Scoring based on PeSTO evaluation function. ---
 
@@ -161,7 +168,395 @@ PST_DICT_EG = {
     chess.ROOK: ROOK_EG, chess.QUEEN: QUEEN_EG,   chess.KING: KING_EG
 }
 
-# --- 2. Player Definitions
+# --- 2. Zobrist keys for incremental hashing ---
+
+# Same random numbers and layout as Polyglot, so incremental keys match chess.polyglot.zobrist_hash() (and opening books)
+POLYGLOT_RANDOM = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+
+# ZOBRIST_PIECE[color][piece_type][square]
+ZOBRIST_PIECE = [[[0]*64 for _ in range(7)] for _ in range(2)]
+for _color in (chess.WHITE, chess.BLACK):
+    for _pt in range(1, 7):
+        for _sq in range(64):
+            ZOBRIST_PIECE[_color][_pt][_sq] = POLYGLOT_RANDOM[64 * ((_pt - 1) * 2 + int(_color)) + _sq]
+
+# Castling key for every combination of the four rook squares that can hold castling rights
+CASTLING_SQUARES = (chess.BB_H1, chess.BB_A1, chess.BB_H8, chess.BB_A8)
+CASTLING_MASK = chess.BB_H1 | chess.BB_A1 | chess.BB_H8 | chess.BB_A8
+ZOBRIST_CASTLING = {}
+for _combo in range(16):
+    _rights, _key = 0, 0
+    for _i, _bb in enumerate(CASTLING_SQUARES):
+        if _combo & (1 << _i):
+            _rights |= _bb
+            _key ^= POLYGLOT_RANDOM[768 + _i]
+    ZOBRIST_CASTLING[_rights] = _key
+
+ZOBRIST_EP_FILE = POLYGLOT_RANDOM[772:780]
+ZOBRIST_TURN = POLYGLOT_RANDOM[780]
+
+def ep_key(board):
+    """
+    Returns the en-passant part of the Polyglot key: the ep file is only hashed when a pawn is ready to capture
+    """
+    ep_square = board.ep_square
+    if ep_square is None:
+        return 0
+    if board.turn == chess.WHITE:
+        ep_mask = chess.shift_down(chess.BB_SQUARES[ep_square])
+    else:
+        ep_mask = chess.shift_up(chess.BB_SQUARES[ep_square])
+    ep_mask = chess.shift_left(ep_mask) | chess.shift_right(ep_mask)
+    if ep_mask & board.pawns & board.occupied_co[board.turn]:
+        return ZOBRIST_EP_FILE[ep_square & 7]
+    return 0
+
+def pawn_key(board):
+    """
+    Returns the Zobrist key of the pawn structure alone (the piece keys of every pawn on the board)
+    """
+    key = 0
+    for color in (chess.WHITE, chess.BLACK):
+        pawns = board.pawns & board.occupied_co[color]
+        while pawns:
+            lsb = pawns & -pawns
+            key ^= ZOBRIST_PIECE[color][chess.PAWN][lsb.bit_length() - 1]
+            pawns ^= lsb
+    return key
+
+# --- 3. Transposition Table ---
+
+class TranspositionTable():
+    """
+    Fixed-size transposition table packed into a flat array of unsigned 64-bit integers.
+
+    • Memory budget given in MB; the number of buckets is rounded down to a power of two
+    • Buckets of two 16-byte entries: a depth-preferred slot and an always-replace slot
+    • Each entry holds (key ^ data, data), so a torn or foreign entry never verifies against the probing key
+    • data packs score, depth, bound flag, generation and the encoded best move
+    • Entries from earlier searches (older generations) are replaced first
+    """
+    ENTRY_WORDS = 2     # 64-bit words per entry
+    BUCKET_SLOTS = 2    # Entries per bucket
+    BUCKET_BYTES = ENTRY_WORDS * BUCKET_SLOTS * 8
+
+    # data layout: move (15 bits) | flag (2 bits) | depth (8 bits) | generation (8 bits) | score (30 bits)
+    FLAG_SHIFT = 16
+    DEPTH_SHIFT = 18
+    GEN_SHIFT = 26
+    SCORE_SHIFT = 34
+    DEPTH_OFFSET = 128
+    SCORE_OFFSET = 1 << 29
+    SCORE_LIMIT = SCORE_OFFSET - 1
+
+    def __init__(self, size_mb=16, buffer=None):
+        self.size_mb = size_mb
+        self.num_buckets = self.num_buckets_for(size_mb)
+        self.mask = self.num_buckets - 1
+        self.generation = 0
+
+        # The table can live in an externally owned buffer (e.g. shared memory) or in its own bytearray
+        if buffer is None:
+            buffer = bytearray(self.buffer_size(size_mb))
+        self.raw = memoryview(buffer).cast('B')[:self.buffer_size(size_mb)]
+        self.table = self.raw.cast('Q')
+
+        # Decoded moves, so probes don't build a new chess.Move every time
+        self.move_cache = {0: None}
+
+    @classmethod
+    def num_buckets_for(cls, size_mb):
+        """
+        Returns the largest power-of-two number of buckets that fits in the memory budget
+        """
+        num_buckets = 1
+        while num_buckets * 2 * cls.BUCKET_BYTES <= size_mb * 1024 * 1024:
+            num_buckets *= 2
+        return num_buckets
+
+    @classmethod
+    def buffer_size(cls, size_mb):
+        """
+        Returns the number of bytes a table with the given memory budget occupies
+        """
+        return cls.num_buckets_for(size_mb) * cls.BUCKET_BYTES
+
+    def new_search(self):
+        """
+        Ages the table: entries written before this call become preferred candidates for replacement
+        """
+        self.generation = (self.generation + 1) & 0xFF
+
+    def clear(self):
+        """
+        Empties the table
+        """
+        self.raw[:] = bytes(len(self.raw))
+        self.generation = 0
+
+    def hashfull(self):
+        """
+        Returns the permille of sampled entries written during the current search
+        """
+        sample = min(1000, self.num_buckets * self.BUCKET_SLOTS)
+        used = 0
+        for i in range(sample):
+            data = self.table[i * self.ENTRY_WORDS + 1]
+            if data and (data >> self.GEN_SHIFT) & 0xFF == self.generation:
+                used += 1
+        return used * 1000 // sample
+
+    @staticmethod
+    def encode_move(move):
+        if move is None:
+            return 0
+        return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+    def decode_move(self, code):
+        move = self.move_cache.get(code)
+        if move is None and code:
+            move = chess.Move(code & 63, (code >> 6) & 63, (code >> 12) or None)
+            self.move_cache[code] = move
+        return move
+
+    def probe(self, key):
+        """
+        Looks up a position. Returns (score, depth, flag, best_move) or None if the position is not stored
+        """
+        table = self.table
+        index = (key & self.mask) << 2
+        for slot in (index, index + 2):
+            data = table[slot + 1]
+            if data and table[slot] ^ data == key:
+                return ((data >> self.SCORE_SHIFT) - self.SCORE_OFFSET,
+                        ((data >> self.DEPTH_SHIFT) & 0xFF) - self.DEPTH_OFFSET,
+                        (data >> self.FLAG_SHIFT) & 3,
+                        self.decode_move(data & 0x7FFF))
+        return None
+
+    def store(self, key, score, depth, flag, best_move):
+        """
+        Stores a search result using the bucket's replacement policy
+        """
+        table = self.table
+        index = (key & self.mask) << 2
+        move_code = self.encode_move(best_move)
+        score = max(-self.SCORE_LIMIT, min(self.SCORE_LIMIT, score))
+        depth = max(-self.DEPTH_OFFSET, min(self.DEPTH_OFFSET - 1, depth))
+
+        # 1. The position is already in the bucket: overwrite it in place (keeping its best move if there is no new one),
+        #    unless it holds a deeper result of the current search, which is worth more than the new one
+        slot = None
+        for candidate in (index, index + 2):
+            old = table[candidate + 1]
+            if old and table[candidate] ^ old == key:
+                old_depth = ((old >> self.DEPTH_SHIFT) & 0xFF) - self.DEPTH_OFFSET
+                if old_depth > depth and (old >> self.GEN_SHIFT) & 0xFF == self.generation:
+                    return
+                slot = candidate
+                if not move_code:
+                    move_code = old & 0x7FFF
+                break
+
+        if slot is None:
+            # 2. Depth-preferred slot: take it if empty, stale, or not deeper than the new entry.
+            #    Its previous occupant moves down into the always-replace slot
+            old = table[index + 1]
+            old_depth = ((old >> self.DEPTH_SHIFT) & 0xFF) - self.DEPTH_OFFSET
+            old_generation = (old >> self.GEN_SHIFT) & 0xFF
+            if not old or old_generation != self.generation or depth >= old_depth:
+                table[index + 2] = table[index]
+                table[index + 3] = old
+                slot = index
+            # 3. Otherwise the always-replace slot
+            else:
+                slot = index + 2
+
+        data = (move_code
+                | (flag << self.FLAG_SHIFT)
+                | ((depth + self.DEPTH_OFFSET) << self.DEPTH_SHIFT)
+                | (self.generation << self.GEN_SHIFT)
+                | ((int(score) + self.SCORE_OFFSET) << self.SCORE_SHIFT))
+        table[slot] = key ^ data
+        table[slot + 1] = data
+
+class PawnHashTable():
+    """
+    Fixed-size cache of pawn-structure evaluation terms, keyed by the pawn-only Zobrist key.
+
+    • The number of slots is a power of two; each key maps to exactly one slot
+    • A new entry always replaces the slot's previous occupant
+    • Pawn terms depend on nothing but the pawns, so entries stay valid across searches and games
+    """
+    def __init__(self, size=1 << 14):
+        self.size = size
+        self.mask = size - 1
+        self.keys = [None] * size
+        self.values = [None] * size
+
+    def probe(self, key):
+        """
+        Returns the (middlegame, endgame) pawn score stored for a pawn key, or None
+        """
+        index = key & self.mask
+        if self.keys[index] == key:
+            return self.values[index]
+        return None
+
+    def store(self, key, value):
+        index = key & self.mask
+        self.keys[index] = key
+        self.values[index] = value
+
+    def clear(self):
+        self.keys = [None] * self.size
+        self.values = [None] * self.size
+
+# --- 4. Search Statistics ---
+
+class SearchStats():
+    """
+    Counters collected during one RAMZPlayer search (enabled with RAMZPlayer(..., stats=True)).
+    When disabled the player holds None instead, so the search only pays for an `is not None` test.
+    """
+    def __init__(self):
+        self.start_time = time.time()
+        self.elapsed = 0.0
+        self.nodes = 0               # All nodes (negamax + quiescence)
+        self.qnodes = 0              # Quiescence nodes
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.tt_stores = 0
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0  # Beta cutoffs caused by the first move searched
+        self.null_move_cutoffs = 0
+        self.pawn_probes = 0
+        self.pawn_hits = 0
+        self.iterations = []         # One entry per completed iterative-deepening iteration
+
+    def record_iteration(self, depth, score, pv, nodes):
+        self.iterations.append({
+            'depth': depth,
+            'score': score,
+            'move': pv[0].uci() if pv[0] else None,
+            'pv': [move.uci() for move in pv if move],
+            'nodes': nodes,
+            'time': time.time() - self.start_time
+        })
+
+    def finish(self, nodes):
+        self.nodes = nodes
+        self.elapsed = time.time() - self.start_time
+
+    def to_dict(self):
+        """
+        Returns the counters plus derived rates as a JSON-serializable dict
+        """
+        return {
+            'nodes': self.nodes,
+            'qnodes': self.qnodes,
+            'time': self.elapsed,
+            'nps': int(self.nodes / self.elapsed) if self.elapsed > 0 else 0,
+            'tt_probes': self.tt_probes,
+            'tt_hits': self.tt_hits,
+            'tt_hit_rate': self.tt_hits / self.tt_probes if self.tt_probes else 0.0,
+            'tt_stores': self.tt_stores,
+            'beta_cutoffs': self.beta_cutoffs,
+            'first_move_cutoff_rate': self.first_move_cutoffs / self.beta_cutoffs if self.beta_cutoffs else 0.0,
+            'null_move_cutoffs': self.null_move_cutoffs,
+            'pawn_probes': self.pawn_probes,
+            'pawn_hit_rate': self.pawn_hits / self.pawn_probes if self.pawn_probes else 0.0,
+            'iterations': self.iterations
+        }
+
+    def dump_json(self, path):
+        """
+        Writes the statistics to a JSON file
+        """
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+# --- 5. Batched Evaluation ---
+
+class BatchEvaluator():
+    """
+    Scores many positions at once with NumPy, giving exactly the same tapered PeSTO scores as RAMZPlayer.utility().
+    Every position becomes 12 piece planes of 64 squares (one row of 768 zeros and ones), so material + PST,
+    game phase and passed pawns are matrix products over the whole batch instead of Python loops per piece
+    """
+    def __init__(self, player):
+        self.player = player
+
+        # Planes are ordered by (color, piece type), black first: plane index = 6 * color + piece type - 1
+        planes = [(color, pt) for color in (chess.BLACK, chess.WHITE) for pt in range(1, 7)]
+        self.PESTO_MG = np.array([player.PESTO_MG[color][pt] for color, pt in planes], dtype=np.int64).reshape(768)
+        self.PESTO_EG = np.array([player.PESTO_EG[color][pt] for color, pt in planes], dtype=np.int64).reshape(768)
+        self.PHASE = np.repeat(np.array([player.PHASE_WEIGHT[pt] for _, pt in planes], dtype=np.int64), 64)
+
+        # PASSED_PAWN_MASK as 0/1 matrices: [pawn square, square an enemy pawn would block it from]
+        self.PASSED_MASK = {
+            color: np.array([[(player.PASSED_PAWN_MASK[color][sq] >> blocker) & 1 for blocker in range(64)]
+                             for sq in range(64)], dtype=np.int64)
+            for color in (chess.WHITE, chess.BLACK)
+        }
+        # Passed-pawn bonuses by square (same values as RAMZPlayer.passed_pawn_score)
+        self.PASSED_MG = 20
+        self.PASSED_EG = {
+            chess.WHITE: np.array([50 + chess.square_rank(sq) * 10 for sq in range(64)], dtype=np.int64),
+            chess.BLACK: np.array([50 + (7 - chess.square_rank(sq)) * 10 for sq in range(64)], dtype=np.int64),
+        }
+
+    @staticmethod
+    def piece_planes(boards):
+        """
+        Converts boards (chess.Board or SearchBoard) to an (N, 768) array of piece planes
+        """
+        bitboards = np.array([[board.pieces_mask(pt, color) for color in (chess.BLACK, chess.WHITE) for pt in range(1, 7)]
+                              for board in boards], dtype='<u8').reshape(len(boards), 12)
+        return np.unpackbits(bitboards.view(np.uint8), axis=1, bitorder='little')
+
+    def evaluate(self, boards, color=None, check_terminal=False):
+        """
+        Returns an int64 array of scores from the given color's point of view (each board's side to move if None).
+        With check_terminal, finished games get utility()'s checkmate / draw scores (needs chess.Board boards).
+        That check generates legal moves board by board in Python, so it costs far more than the scoring itself
+        """
+        if not boards:
+            return np.zeros(0, dtype=np.int64)
+
+        planes = self.piece_planes(boards)
+        mg = planes @ self.PESTO_MG
+        eg = planes @ self.PESTO_EG
+        phase = np.minimum(planes @ self.PHASE, 24)
+
+        # Passed pawns: no enemy pawn on any square of the pawn's mask
+        black_pawns = planes[:, 0:64]
+        white_pawns = planes[:, 6 * 64:7 * 64]
+        white_passed = white_pawns * ((black_pawns @ self.PASSED_MASK[chess.WHITE].T) == 0)
+        black_passed = black_pawns * ((white_pawns @ self.PASSED_MASK[chess.BLACK].T) == 0)
+        mg += self.PASSED_MG * (white_passed.sum(axis=1, dtype=np.int64) - black_passed.sum(axis=1, dtype=np.int64))
+        eg += white_passed @ self.PASSED_EG[chess.WHITE] - black_passed @ self.PASSED_EG[chess.BLACK]
+
+        # Tapered score from White's perspective (floor division, like utility), then from the requested side's
+        scores = (mg * phase + eg * (24 - phase)) // 24
+        colors = [board.turn if color is None else color for board in boards]
+        scores = np.where(np.array(colors, dtype=bool), scores, -scores)
+
+        if check_terminal:
+            for i, board in enumerate(boards):
+                terminal_score = self.player.terminal_utility(board)
+                if terminal_score is not None:
+                    scores[i] = terminal_score if colors[i] == self.player.mycolor else -terminal_score
+        return scores
+
+# --- 6. Player Definitions
+
+class SearchTimeout(Exception):
+    """
+    Raised inside the search once the hard time limit has passed. Unwinds the recursion back to make_move,
+    which then plays the best move from the last completed (or partially searched) iteration.
+    """
+    pass
 
 class RandomPlayer():
     """
@@ -172,6 +567,10 @@ class RandomPlayer():
     
     def get_color(self):
         return self.color
+
+    def new_game(self, color=None):
+        if color is not None:
+            self.color = color
     
     def make_move(self, board):
         legal_actions = []
@@ -187,39 +586,85 @@ class RAMZPlayer():
 
     The agent includes the following core components:
 
-    • Iterative Deepening Negamax search with alpha-beta pruning
-    • Transposition Table using Zobrist hashing with exact / lower / upper bounds
+    • Iterative Deepening Negamax search with alpha-beta pruning, running on a lean bitboard board (bitboard.SearchBoard)
+    • Principal Variation Search (null-window searches) with aspiration windows at the root
+    • Fixed-size Transposition Table using Zobrist hashing with exact / lower / upper bounds
     • Advanced move ordering:
-        - Transposition-table best move first
-        - MVV-LVA (Most Valuable Victim; Least Valuable Attacker) for captures
+        - Previous iteration's principal variation (triangular PV table), then the transposition-table best move
+        - MVV-LVA (Most Valuable Victim; Least Valuable Attacker) for captures, losing captures (by SEE) last
         - Killer move heuristic (depth-based beta-cutoff moves)
         - History heuristic (global quiet-move cutoff statistics)
     • Quiescence search to mitigate the horizon effect:
-        - Capture- and promotion-only search
+        - Capture- and promotion-only search, skipping captures with a negative static exchange evaluation
         - Stand-pat evaluation
         - Delta pruning for hopeless tactical lines
     • Null-Move Pruning with safeguards against zugzwang
+    • Cheap draw detection (repetition via the Zobrist key history, fifty-move rule, insufficient material)
+      and ply-adjusted mate scores found from the move loop
+    • Late Move Reductions and (reverse) futility pruning near the leaves, each switchable
+    • Optional pondering: searching the expected reply on the opponent's time
+    • Optional Lazy SMP: helper processes search the same position into a shared-memory transposition table
     • Opening book support via Polyglot format
-    • Syzygy endgame tablebase support (when available)
+    • Syzygy endgame tablebase support (when available): DTZ move choice at the root, cached WDL cuts in search
 
     Position evaluation is performed using a tapered PeSTO evaluation function:
     • Separate middlegame and endgame material values
     • Piece-square tables for all pieces
     • Smooth phase interpolation based on remaining material
-    • Passed-pawn detection using bitboard masks with rank-scaled bonuses
+    • Passed-pawn detection using bitboard masks with rank-scaled bonuses, cached in a pawn hash table
+    • A NumPy batch version (evaluate_batch) scoring many positions in one pass with identical results
     """
-    def __init__(self, mycolor, depth_limit, time_limit, opening_book_path, syzygy_path):
+    def __init__(self, mycolor, depth_limit, time_limit, opening_book_path, syzygy_path, hash_mb=16, workers=1,
+                 stats=False, on_stats=None, lmr=True, futility=True, ponder=False):
         # Setting agent color, depth limit, time limit, and opening book.
         self.mycolor = mycolor
         self.depth_limit = depth_limit
         self.time_limit = time_limit
         self.opening_book_path = opening_book_path
         self.syzygy_path = syzygy_path
+        self.hash_mb = hash_mb
+        self.workers = max(1, workers)
 
-        # Caching moves for lookup throughout the game
-        self.transposition_table = {}
+        # Opening book is memory-mapped once and kept open for the lifetime of the player
+        self.opening_book = None
+        if opening_book_path:
+            try:
+                self.opening_book = chess.polyglot.open_reader(opening_book_path)
+            except Exception as e:
+                print(f"OPENING BOOK ERROR: {e}", file=sys.stderr)
+        self.BOOK_MISS_LIMIT = 3    # Consecutive out-of-book moves after which the book is no longer probed
+        self.book_misses = 0
+        self.book_last_ply = 0
+
+        # Syzygy tablebases are opened once as well. WDL results found during search are cached by Zobrist key
+        self.tablebase = None
+        self.tb_max_pieces = 0
+        if syzygy_path:
+            try:
+                self.tablebase = chess.syzygy.open_tablebase(syzygy_path)
+                self.tb_max_pieces = max((len(name) - 1 for name in self.tablebase.wdl), default=0)
+            except Exception as e:
+                print(f"SYZYGY ERROR: {e}", file=sys.stderr)
+                self.tablebase = None
+        self.tb_cache = {}
+        self.TB_CACHE_SIZE = 100000
+        self.TB_MISSING = object()    # Cached for positions whose table is not available
+        self.TB_WIN_SCORE = 80000000  # Tablebase win: above any evaluation, below mate scores
+        self.MATE_SCORE = 99999999    # Mate at the root; a mate n plies away scores MATE_SCORE - n
+
+        # Caching moves for lookup throughout the game. With several workers the table lives in shared memory.
+        # Helpers are spawned, not forked: the search may run on a thread (UCI), and a process forked from it
+        # inherits locks held by the other threads and can deadlock on start-up
+        self.mp_context = multiprocessing.get_context('spawn')
+        self.tt_buffer = None
+        if self.workers > 1:
+            self.tt_buffer = self.mp_context.RawArray('B', TranspositionTable.buffer_size(hash_mb))
+        self.transposition_table = TranspositionTable(hash_mb, buffer=self.tt_buffer)
         self.history_table = [[[0 for _ in range(64)] for _ in range(64)] for _ in range(2)]
-        self.MAX_PLY = 16 # Max search depth (ply)
+        # Pawn-structure scores, keyed by the pawn-only Zobrist key (the pawns rarely change between nodes)
+        self.PAWN_HASH_SIZE = 1 << 14
+        self.pawn_hash_table = PawnHashTable(self.PAWN_HASH_SIZE)
+        self.MAX_PLY = 64 # Max search depth (ply)
         # Create a list of [None, None] for each ply
         self.killer_moves = [[None, None] for _ in range(self.MAX_PLY)]
         self.init_pst_tables()
@@ -228,6 +673,89 @@ class RAMZPlayer():
         self.ENTRY_TYPE_EXACT = 0
         self.ENTRY_TYPE_LOWER = 1
         self.ENTRY_TYPE_UPPER = 2
+        self.QS_TT_DEPTH = -1  # Depth of quiescence entries in the transposition table
+
+        # Piece values for static exchange evaluation, indexed by piece type
+        self.SEE_VALUES = [0, 100, 300, 300, 500, 900, 20000]
+
+        # Aspiration windows: half-width of the first root window, the depth they start at, and the widening
+        # after which a failing side is opened up completely
+        self.ASPIRATION_WINDOW = 50
+        self.ASPIRATION_MIN_DEPTH = 3
+        self.ASPIRATION_MAX = 1000
+
+        # Late move reductions: quiet moves after the first LMR_MIN_MOVES are reduced by one ply
+        # (two after LMR_LATE_MOVES) at remaining depths of at least LMR_MIN_DEPTH
+        self.use_lmr = lmr
+        self.LMR_MIN_DEPTH = 3
+        self.LMR_MIN_MOVES = 3
+        self.LMR_LATE_MOVES = 6
+
+        # Futility pruning margins, indexed by remaining depth, and reverse futility margin per remaining ply
+        self.use_futility = futility
+        self.FUTILITY_MARGIN = [0, 200, 400]
+        self.REVERSE_FUTILITY_MARGIN = 120
+        self.REVERSE_FUTILITY_DEPTH = 3
+
+        # Time management. The clock is polled every NODE_CHECK_INTERVAL nodes (must be a power of two)
+        self.NODE_CHECK_INTERVAL = 128
+        self.MOVES_TO_GO = 30        # Assumed number of moves left when budgeting from a game clock
+        self.MOVE_OVERHEAD = 0.05    # Safety margin (seconds) for returning the move and GUI/engine latency
+        self.nodes = 0
+        self.soft_deadline = float("inf")
+        self.hard_deadline = float("inf")
+        self.root_best_move = None
+        self.stop_event = None      # Set from outside (another process or thread) to abort the search
+        self.node_limit = None      # Optional node budget per search, enforced like the hard deadline
+
+        # Score and depth of the last completed iteration of the latest search
+        self.score = None
+        self.completed_depth = 0
+
+        # Optional search statistics: a SearchStats per search while enabled, None otherwise.
+        # on_stats(stats) is called after every search
+        self.collect_stats = stats
+        self.on_stats = on_stats
+        self.stats = None
+
+        # NumPy evaluator for batches of positions, created on first use
+        self.batch_evaluator = None
+
+        # Optional progress hook, called as on_iteration(depth, score, pv, nodes) after every completed iteration
+        self.on_iteration = None
+
+        # Principal variation: pv_table[ply] holds the best line found from that ply, pv the line of the last
+        # completed iteration (pv[0] is the move played) and previous_pv the line the next iteration searches first
+        self.pv_table = [[] for _ in range(self.MAX_PLY + 2)]
+        self.pv = [None]
+        self.previous_pv = []
+        self.follow_pv = False
+
+        # Pondering: after each move a background thread searches the position after the expected reply
+        # (the second move of the PV). ponder_key identifies that position, ponder_result is the thread's best move
+        self.ponder = ponder
+        self.ponder_thread = None
+        self.ponder_stop = threading.Event()
+        self.ponder_key = None
+        self.ponder_result = None
+
+        # Lazy SMP helper processes as (process, task queue) pairs, started on the first search
+        self.helpers = []
+        self.helper_stop = None
+        self.helper_done = None
+        self.helper_busy = set()    # Indices of helpers whose "done" token has not been received yet
+        self.HELPER_STOP_TIMEOUT = 5    # Seconds a helper gets to abandon its search before it counts as stuck
+
+        # Zobrist keys of the positions on the search path, maintained by push_move/pop_move. The keys of the game
+        # positions before the root (back to the last capture or pawn move) sit below it, for repetition detection
+        self.key_stack = [0]
+        self.root_index = 0
+        # Indices in key_stack of positions reached by a null move; repetitions are not looked for across them
+        self.null_indices = []
+        # (mg score, eg score, phase) accumulators of the positions on the search path, also maintained by push_move/pop_move
+        self.eval_stack = [(0, 0, 0)]
+        # Pawn-only Zobrist keys of the positions on the search path (for the pawn hash table), likewise
+        self.pawn_key_stack = [0]
 
     @staticmethod
     def iter_bits(bitboard):
@@ -285,32 +813,355 @@ class RAMZPlayer():
                     b_mask |= (1 << (r * 8 + f))
             self.PASSED_PAWN_MASK[chess.BLACK][sq] = b_mask
 
+        # Combined material + PST values signed from White's perspective, indexed [color][piece_type][square].
+        # These are what the incremental evaluation adds and subtracts when pieces move
+        self.PESTO_MG = [[[0]*64 for _ in range(7)] for _ in range(2)]
+        self.PESTO_EG = [[[0]*64 for _ in range(7)] for _ in range(2)]
+        for pt in range(1, 7):
+            mg_val, eg_val = MATERIAL_PESTO[pt]
+            for sq in range(64):
+                self.PESTO_MG[chess.WHITE][pt][sq] = mg_val + self.PST_MG_WHITE[pt][sq]
+                self.PESTO_EG[chess.WHITE][pt][sq] = eg_val + self.PST_EG_WHITE[pt][sq]
+                self.PESTO_MG[chess.BLACK][pt][sq] = -(mg_val + self.PST_MG_BLACK[pt][sq])
+                self.PESTO_EG[chess.BLACK][pt][sq] = -(eg_val + self.PST_EG_BLACK[pt][sq])
+
+        # Game phase contribution of each piece type (knight/bishop 1, rook 2, queen 4), indexed by piece type
+        self.PHASE_WEIGHT = [0, 0, 1, 1, 2, 4, 0]
+
     def get_color(self):
         """
         Returns color agent is playing
         """
         return self.mycolor
 
-    def make_move(self, board, time_limit=10.0):
+    def new_game(self, color=None):
         """
-        Decides what move the agent should play
+        Resets the game-specific state (transposition table contents, move ordering tables, opening book
+        progress, pondering) so the player can start another game without being rebuilt. Opened files,
+        the table's memory, the tablebase cache and the SMP helper processes are kept
         """
-        # 1. Try looking through the opening book. If a move exists in the book, look it up and play it
-        if self.opening_book_path:
+        self.cancel_pondering()
+
+        if color is not None:
+            self.mycolor = color
+        self.book_misses = 0
+        self.book_last_ply = 0
+        self.transposition_table.clear()
+        self.history_table = [[[0 for _ in range(64)] for _ in range(64)] for _ in range(2)]
+        self.killer_moves = [[None, None] for _ in range(self.MAX_PLY)]
+        self.pv = [None]
+        self.previous_pv = []
+        self.stats = None
+
+    def book_move(self, board):
+        """
+        Returns a weighted random move from the opening book, or None if the position is not in the book.
+        Lookups stop once the game has been out of book for BOOK_MISS_LIMIT of the agent's moves
+        """
+        if self.opening_book is None:
+            return None
+
+        # Fewer plies than last time means a new game started on this player: the book is worth a look again
+        if board.ply() < self.book_last_ply:
+            self.book_misses = 0
+        self.book_last_ply = board.ply()
+
+        if self.book_misses >= self.BOOK_MISS_LIMIT:
+            return None
+
+        try:
+            entries = list(self.opening_book.find_all(board))
+        except Exception as e:
+            print(f"OPENING BOOK ERROR: {e}", file=sys.stderr)
+            return None
+
+        if not entries:
+            self.book_misses += 1
+            return None
+
+        self.book_misses = 0
+        return random.choices(entries, weights=[entry.weight for entry in entries])[0].move
+
+    def tablebase_move(self, board):
+        """
+        Picks the root move from the Syzygy DTZ tables: wins by the shortest distance to zeroing,
+        draws if no win exists, and otherwise loses as slowly as possible. None if the position is not covered
+        """
+        if self.tablebase is None or board.castling_rights or chess.popcount(board.occupied) > self.tb_max_pieces:
+            return None
+
+        best_move = None
+        best_rank = None
+        for move in board.legal_moves:
+            board.push(move)
             try:
-                with chess.polyglot.open_reader(self.opening_book_path) as reader:
-                    if sum(1 for _ in reader.find_all(board)) > 0:
-                        return reader.weighted_choice(board).move
-            except Exception as e:
-                print(f"OPENING BOOK ERROR: {e}")
-                pass
+                if board.is_checkmate():
+                    board.pop()
+                    return move
+                # Both probes are from the opponent's point of view after our move
+                wdl = -self.tablebase.probe_wdl(board)
+                dtz = abs(self.tablebase.probe_dtz(board))
+            except KeyError:
+                # A table for one of the resulting positions is missing: let the search decide
+                board.pop()
+                return None
+            board.pop()
+
+            if wdl > 0:
+                rank = (wdl, -dtz)
+            elif wdl < 0:
+                rank = (wdl, dtz)
+            else:
+                rank = (0, 0)
+            if best_rank is None or rank > best_rank:
+                best_move, best_rank = move, rank
+
+        return best_move
+
+    def probe_wdl(self, board, zobrist_key):
+        """
+        Returns the tablebase WDL value (-2 loss ... 2 win, side to move's view) of the position, or None if not covered
+        """
+        wdl = self.tb_cache.get(zobrist_key)
+        if wdl is None:
+            try:
+                wdl = self.tablebase.probe_wdl(board.to_board())
+            except KeyError:
+                wdl = self.TB_MISSING
+            if len(self.tb_cache) >= self.TB_CACHE_SIZE:
+                self.tb_cache.clear()
+            self.tb_cache[zobrist_key] = wdl
+        return None if wdl is self.TB_MISSING else wdl
+
+    def allocate_time(self, time_limit=None, clock=None, increment=0.0):
+        """
+        Splits the available time into a soft limit (no new iteration is started after it) and a
+        hard limit (the running iteration is aborted). Budgets from the remaining clock and increment
+        when a clock is given, otherwise from the fixed per-move time limit.
+        """
+        if time_limit is None:
+            time_limit = self.time_limit
+
+        if clock is None:
+            # Fixed time per move: the next depth will likely take longer than the remaining 50%
+            hard_limit = max(time_limit - self.MOVE_OVERHEAD, 0.01)
+            return hard_limit / 2, hard_limit
+
+        # Game clock: spend an even share of the remaining time plus most of the increment
+        usable = max(clock - self.MOVE_OVERHEAD, 0.01)
+        soft_limit = usable / self.MOVES_TO_GO + increment * 0.75
+        hard_limit = min(soft_limit * 3, usable / 2 + increment / 2)
+        soft_limit = min(soft_limit, hard_limit)
+
+        # A per-move time limit still caps clock-based budgets
+        if time_limit:
+            hard_limit = min(hard_limit, max(time_limit - self.MOVE_OVERHEAD, 0.01))
+            soft_limit = min(soft_limit, hard_limit / 2)
 
-        # 2. Resetting transposition tables if they get too large (to save on memory)
-        if len(self.transposition_table) > 1000000:
-            self.transposition_table.clear()
-            print("TT cleared due to size limit.")
+        return soft_limit, hard_limit
+
+    def make_move(self, board, time_limit=None, clock=None, increment=0.0):
+        """
+        Decides what move the agent should play.
+        time_limit: seconds for this move (defaults to the player's time_limit)
+        clock, increment: remaining time and increment (seconds) on the agent's clock, if playing with one
+        """
+        # 0. Pondering: if the opponent played the expected reply, the background search simply continues
+        # under this move's time limits. Otherwise it is stopped, having at least warmed up the transposition table
+        if self.ponder_thread is not None:
+            ponder_move = self.stop_pondering(board, time_limit, clock, increment)
+            if ponder_move is not None:
+                self.start_pondering(board, ponder_move)
+                return ponder_move
+
+        self.stats = None
+
+        # 1. Try looking through the opening book. If a move exists in the book, look it up and play it
+        book_move = self.book_move(board)
+        if book_move is not None:
+            return book_move
+
+        # In tablebase territory the DTZ tables give the correct move without searching
+        tablebase_move = self.tablebase_move(board)
+        if tablebase_move is not None:
+            return tablebase_move
+
+        # 2. Aging the transposition table, so entries from previous moves get replaced first
+        self.transposition_table.new_search()
+
+        soft_limit, hard_limit = self.allocate_time(time_limit, clock, increment)
+        start_time = time.time()
+
+        # 3. Lazy SMP: helper processes search the same position into the shared transposition table
+        if self.workers > 1:
+            self.start_helpers(board, start_time + hard_limit)
+
+        # 4. Performing iterative Deepening. Stops at either depth limit or at time limit
+        if self.collect_stats:
+            self.stats = SearchStats()
+        try:
+            best_move_so_far = self.search(board, self.depth_limit, start_time + soft_limit, start_time + hard_limit)
+        finally:
+            if self.workers > 1:
+                self.stop_helpers()
+
+        if self.stats is not None:
+            self.stats.finish(self.nodes)
+            if self.on_stats is not None:
+                self.on_stats(self.stats)
+
+        # Out of time before depth 1 finished: play the move with the best static score rather than forfeit
+        if best_move_so_far is None:
+            scored_moves = self.score_root_moves(board)
+            best_move_so_far = max(scored_moves, key=lambda x: x[0])[1] if scored_moves else None
+
+        if self.ponder:
+            self.start_pondering(board, best_move_so_far)
         
+        return best_move_so_far
+
+    def analyse(self, board, depth=None, nodes=None, time_limit=None):
+        """
+        Searches a position for analysis (no opening book or tablebase shortcuts) to the given depth, node budget
+        and/or time limit, and returns the result as a dict: best move, score (centipawns from the side to move's
+        point of view), PV, completed depth, nodes and time
+        """
+        if depth is None and nodes is None and time_limit is None:
+            depth = self.depth_limit
+        depth = min(depth if depth is not None else self.MAX_PLY, self.MAX_PLY)
+
+        # The ponder thread shares all search state, so it has to be gone before another search starts
+        self.cancel_pondering()
+        self.mycolor = board.turn
+        self.node_limit = nodes
+        self.transposition_table.new_search()
+        start_time = time.time()
+        if time_limit is not None:
+            soft_limit, hard_limit = self.allocate_time(time_limit)
+            soft_deadline, hard_deadline = start_time + soft_limit, start_time + hard_limit
+        else:
+            soft_deadline = hard_deadline = float("inf")
 
+        try:
+            best_move = self.search(board, depth, soft_deadline, hard_deadline)
+        finally:
+            self.node_limit = None
+
+        return {
+            'best_move': best_move.uci() if best_move else None,
+            'score': self.score,
+            'pv': [move.uci() for move in self.pv if move],
+            'depth': self.completed_depth,
+            'nodes': self.nodes,
+            'time': time.time() - start_time,
+        }
+
+    def evaluate_batch(self, boards, color=None, check_terminal=False):
+        """
+        Scores a list of positions in one NumPy pass (see BatchEvaluator). Same scores as evaluate() from
+        the given color's point of view, or from each board's side to move if color is None; with
+        check_terminal, same scores as utility() (finished games included) but much slower
+        """
+        if self.batch_evaluator is None:
+            self.batch_evaluator = BatchEvaluator(self)
+        return self.batch_evaluator.evaluate(boards, color, check_terminal)
+
+    def score_root_moves(self, board):
+        """
+        Returns (static score for the side to move, move) for every legal move, scoring all resulting positions in one batch.
+        Only checkmates are looked for among the results, and only after checking moves
+        """
+        moves = list(board.legal_moves)
+        children = []
+        for move in moves:
+            child = board.copy(stack=False)
+            child.push(move)
+            children.append(child)
+        scores = self.evaluate_batch(children, color=board.turn)
+        for i, child in enumerate(children):
+            if child.is_check() and child.is_checkmate():
+                scores[i] = self.MATE_SCORE - 1
+        return [(int(score), move) for score, move in zip(scores, moves)]
+
+    def start_pondering(self, board, move):
+        """
+        Starts searching the position after our move and the opponent's expected reply in a background thread
+        """
+        if move is None:
+            return
+        ponder_board = board.copy()
+        ponder_board.push(move)
+
+        # The expected reply comes from the PV, or from the transposition table when a hash cutoff cut the PV short
+        reply = self.pv[1] if len(self.pv) > 1 and self.pv[0] == move else None
+        if reply is None:
+            entry = self.transposition_table.probe(chess.polyglot.zobrist_hash(ponder_board))
+            reply = entry[3] if entry is not None else None
+        if reply is None or not ponder_board.is_legal(reply):
+            return
+        ponder_board.push(reply)
+
+        self.ponder_key = chess.polyglot.zobrist_hash(ponder_board)
+        self.ponder_result = None
+        self.ponder_stop.clear()
+        # No deadlines until the opponent's move arrives (set before the thread starts, so a quick reply can't race it)
+        self.soft_deadline = float("inf")
+        self.hard_deadline = float("inf")
+        self.ponder_thread = threading.Thread(target=self.ponder_search, args=(ponder_board,), daemon=True)
+        self.ponder_thread.start()
+
+    def ponder_search(self, board):
+        """
+        Body of the ponder thread: an ordinary iterative deepening search without deadlines, stopped
+        by stop_pondering on a ponder miss or given this move's deadlines on a ponder hit
+        """
+        self.transposition_table.new_search()
+        self.stats = SearchStats() if self.collect_stats else None
+        self.ponder_result = self.search(board, self.depth_limit, None, None)
+
+    def stop_pondering(self, board, time_limit=None, clock=None, increment=0.0):
+        """
+        Ends pondering once the opponent has moved. On a ponder hit the search keeps going until the time allocated
+        from now on runs out, and its move is returned; on a miss it is aborted and None is returned
+        """
+        ponder_hit = self.ponder_key == chess.polyglot.zobrist_hash(board)
+        if ponder_hit:
+            soft_limit, hard_limit = self.allocate_time(time_limit, clock, increment)
+            start_time = time.time()
+            self.soft_deadline = start_time + soft_limit
+            self.hard_deadline = start_time + hard_limit
+        else:
+            self.ponder_stop.set()
+
+        self.ponder_thread.join()
+        self.ponder_thread = None
+        self.ponder_key = None
+        self.ponder_stop.clear()
+        if ponder_hit and self.ponder_result is not None:
+            if self.stats is not None:
+                self.stats.finish(self.nodes)
+                if self.on_stats is not None:
+                    self.on_stats(self.stats)
+            return self.ponder_result
+        return None
+
+    def cancel_pondering(self):
+        """
+        Aborts the ponder search, if one is running, and waits for its thread to finish
+        """
+        if self.ponder_thread is not None:
+            self.ponder_stop.set()
+            self.ponder_thread.join()
+            self.ponder_thread = None
+            self.ponder_stop.clear()
+        self.ponder_key = None
+
+    def search(self, board, depth_limit, soft_deadline, hard_deadline, start_depth=1):
+        """
+        Iterative deepening from start_depth up to depth_limit. No new iteration is started after soft_deadline,
+        and the running one is aborted at hard_deadline. Returns the best move found (None if depth 1 didn't finish).
+        Deadlines of None leave the current ones in place, so another thread can still set them (pondering)
+        """
         self.killer_moves = [[None, None] for _ in range(self.MAX_PLY)]
         # Reset history heuristic (divide by 2 to decay old values)
         for c in range(2):
@@ -319,40 +1170,388 @@ class RAMZPlayer():
                     self.history_table[c][f][t] //= 2
 
         best_move_so_far = None
-        start_time = time.time()
+        previous_score = None
+        self.score = None
+        self.completed_depth = 0
+        self.pv = [None]
+        self.previous_pv = []
+        if soft_deadline is not None:
+            self.soft_deadline = soft_deadline
+            self.hard_deadline = hard_deadline
+        self.nodes = 0
+        # The search runs on a lean SearchBoard copy of the root position; the caller's board is left untouched
+        self.key_stack = self.history_keys(board)
+        board = SearchBoard(board)
+        root_stack_size = len(board.move_stack)
+        self.root_index = len(self.key_stack) - 1
+        self.null_indices = []
+        self.eval_stack = [self.pesto_accumulators(board)]
+        self.pawn_key_stack = [pawn_key(board)]
         
-        # 3. Performing iterative Deepening. Stops at either depth limit or at time limit
-        for current_depth in range(1, self.depth_limit):
+        for current_depth in range(start_depth, depth_limit + 1):
             
-            # CHECK TIME: If agent used more than 50% of its time, stop. (Because the next depth will likely take longer than the remaining 50%)
-            if (time.time() - start_time) > (self.time_limit/2):
+            # CHECK TIME: Don't start an iteration past the soft limit, it would most likely be aborted anyway
+            if time.time() > self.soft_deadline:
+                break
+            if self.node_limit is not None and self.nodes >= self.node_limit:
                 break
 
             try:
-                # Search using Negamax
-                score, move = self.negamax(board, float("-inf"), float("inf"), current_depth, 0)
+                # Search using Negamax inside an aspiration window around the previous iteration's score,
+                # widening the window on the failing side until the score lands inside it
+                alpha, beta = float("-inf"), float("inf")
+                delta = self.ASPIRATION_WINDOW
+                if current_depth >= self.ASPIRATION_MIN_DEPTH and previous_score is not None and abs(previous_score) < self.TB_WIN_SCORE - self.MAX_PLY:
+                    alpha, beta = previous_score - delta, previous_score + delta
+
+                while True:
+                    self.follow_pv = True
+                    self.root_best_move = None
+                    score, move = self.negamax(board, alpha, beta, current_depth, 0)
+                    if score <= alpha:
+                        alpha = score - delta if delta < self.ASPIRATION_MAX else float("-inf")
+                    elif score >= beta:
+                        beta = score + delta if delta < self.ASPIRATION_MAX else float("inf")
+                    else:
+                        break
+                    delta *= 4
+                previous_score = score
+                self.score = score
+                self.completed_depth = current_depth
                 
-                # Update best move
+                # Update best move and principal variation (a root TT cutoff leaves only the move)
                 best_move_so_far = move
+                self.pv = self.pv_table[0] if self.pv_table[0] and self.pv_table[0][0] == move else [move]
+                self.previous_pv = self.pv
+                if self.stats is not None:
+                    self.stats.record_iteration(current_depth, score, self.pv, self.nodes)
+                if self.on_iteration is not None:
+                    self.on_iteration(current_depth, score, self.pv, self.nodes)
                 
                 # If checkmate found, stop search early and just play out that sequence (to save on time)
-                if score > 90000000:
+                if score > self.MATE_SCORE - self.MAX_PLY:
                     break
 
+            except SearchTimeout:
+                # Hard limit hit mid-iteration. Root moves are searched best-first, so a root move that
+                # finished searching at this depth is at least as good as the last iteration's choice
+                if self.root_best_move is not None:
+                    best_move_so_far = self.root_best_move
+                    if self.root_best_move != self.pv[0]:
+                        self.pv = [self.root_best_move]
+                break
+
             except Exception as e:
-                print(f"Error at depth {current_depth}: {e}")
+                print(f"Error at depth {current_depth}: {e}", file=sys.stderr)
                 break
-        
+
+            finally:
+                # An aborted search leaves its moves on the board, so unwind back to the root position
+                while len(board.move_stack) > root_stack_size:
+                    board.pop()
+                del self.key_stack[self.root_index + 1:]
+                self.null_indices = []
+                del self.eval_stack[1:]
+                del self.pawn_key_stack[1:]
+
+        self.soft_deadline = float("inf")
+        self.hard_deadline = float("inf")
         return best_move_so_far
 
+    def history_keys(self, board):
+        """
+        Returns the Zobrist keys of the game positions since the last capture or pawn move (older ones can't repeat),
+        ending with the key of the current position
+        """
+        keys = [chess.polyglot.zobrist_hash(board)]
+        history = board.copy()
+        for _ in range(min(board.halfmove_clock, len(board.move_stack))):
+            history.pop()
+            keys.append(chess.polyglot.zobrist_hash(history))
+        keys.reverse()
+        return keys
+
+    def check_time(self):
+        """
+        Called every NODE_CHECK_INTERVAL nodes. Aborts the search once the hard deadline has passed, the node budget
+        is used up or a stop was requested
+        """
+        if (time.time() >= self.hard_deadline or self.ponder_stop.is_set()
+                or (self.node_limit is not None and self.nodes >= self.node_limit)
+                or (self.stop_event is not None and self.stop_event.is_set())):
+            raise SearchTimeout()
+
+    def start_helpers(self, board, hard_deadline):
+        """
+        Hands the root position to every Lazy SMP helper process (starting them on first use)
+        """
+        # Helpers that were too slow to stop last time must be idle before the stop flag is cleared again,
+        # or they would carry on searching the previous position. Ones that still don't report back are
+        # restarted, together with the others (a killed process may leave the shared queue unusable)
+        if self.helper_busy:
+            self.helper_stop.set()
+            if not self.wait_for_helpers(timeout=self.HELPER_STOP_TIMEOUT):
+                print(f"SMP helpers {sorted(self.helper_busy)} are stuck, restarting them", file=sys.stderr)
+                self.shutdown_helpers()
+
+        if not self.helpers:
+            ctx = self.mp_context
+            self.helper_stop = ctx.Event()
+            self.helper_done = ctx.Queue()
+            for index in range(1, self.workers):
+                tasks = ctx.Queue()
+                process = ctx.Process(
+                    target=smp_helper_main,
+                    args=(index, self.tt_buffer, self.hash_mb, tasks, self.helper_done, self.helper_stop),
+                    daemon=True
+                )
+                process.start()
+                self.helpers.append((process, tasks))
+
+        self.helper_stop.clear()
+        task = (board.copy(), self.mycolor, self.depth_limit, hard_deadline, self.transposition_table.generation)
+        for _, tasks in self.helpers:
+            tasks.put(task)
+        self.helper_busy = set(range(1, self.workers))
+
+    def wait_for_helpers(self, timeout):
+        """
+        Collects "done" tokens until every busy helper has reported back. Returns False if a token did not
+        arrive within timeout seconds; the helpers still out stay in helper_busy
+        """
+        while self.helper_busy:
+            try:
+                self.helper_busy.discard(self.helper_done.get(timeout=timeout))
+            except queue.Empty:
+                return False
+        return True
+
+    def stop_helpers(self):
+        """
+        Tells the helpers to abandon their search and waits until all of them are idle again
+        """
+        self.helper_stop.set()
+        if not self.wait_for_helpers(timeout=self.HELPER_STOP_TIMEOUT):
+            # stdout may be a UCI connection, so the warning goes to stderr
+            print(f"SMP helpers {sorted(self.helper_busy)} did not stop in time", file=sys.stderr)
+
+    def close(self):
+        """
+        Stops pondering, closes the opening book and tablebases and shuts down the Lazy SMP helper processes, if any were started
+        """
+        self.cancel_pondering()
+
+        if self.opening_book is not None:
+            self.opening_book.close()
+            self.opening_book = None
+        if self.tablebase is not None:
+            self.tablebase.close()
+            self.tablebase = None
+
+        self.shutdown_helpers()
+
+    def shutdown_helpers(self):
+        """
+        Ends the Lazy SMP helper processes, terminating any that don't exit in time. The next search starts new ones
+        """
+        for process, tasks in self.helpers:
+            tasks.put(None)
+        for process, _ in self.helpers:
+            process.join(timeout=self.HELPER_STOP_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self.helpers = []
+        self.helper_busy = set()
+
+    def push_move(self, board, move):
+        """
+        Plays a move and pushes the Zobrist key, pawn key and PeSTO accumulators of the new position. All are updated
+        incrementally: the keys by XOR-ing out the old and in the new piece, castling, en-passant and side-to-move
+        keys, the accumulators by adding and subtracting the material + PST values of the pieces that changed
+        """
+        color = board.turn
+        from_sq = move.from_square
+        to_sq = move.to_square
+        piece_type = board.piece_type_at(from_sq)
+        our_keys = ZOBRIST_PIECE[color]
+        our_mg = self.PESTO_MG[color]
+        our_eg = self.PESTO_EG[color]
+        mg, eg, phase = self.eval_stack[-1]
+        pawn_hash = self.pawn_key_stack[-1]
+
+        key = self.key_stack[-1] ^ ZOBRIST_TURN ^ ZOBRIST_CASTLING[board.castling_rights & CASTLING_MASK]
+        if board.ep_square is not None:
+            key ^= ep_key(board)
+
+        if piece_type == chess.KING and board.is_castling(move):
+            # King and rook both move (handles both e1g1 and king-takes-rook encodings)
+            rank_base = from_sq & 56
+            if (to_sq & 7) > (from_sq & 7):
+                king_to, rook_from, rook_to = rank_base + 6, rank_base + 7, rank_base + 5
+            else:
+                king_to, rook_from, rook_to = rank_base + 2, rank_base, rank_base + 3
+            key ^= our_keys[chess.KING][from_sq] ^ our_keys[chess.KING][king_to]
+            key ^= our_keys[chess.ROOK][rook_from] ^ our_keys[chess.ROOK][rook_to]
+            mg += our_mg[chess.KING][king_to] - our_mg[chess.KING][from_sq] + our_mg[chess.ROOK][rook_to] - our_mg[chess.ROOK][rook_from]
+            eg += our_eg[chess.KING][king_to] - our_eg[chess.KING][from_sq] + our_eg[chess.ROOK][rook_to] - our_eg[chess.ROOK][rook_from]
+        else:
+            new_type = move.promotion or piece_type
+            key ^= our_keys[piece_type][from_sq] ^ our_keys[new_type][to_sq]
+            mg += our_mg[new_type][to_sq] - our_mg[piece_type][from_sq]
+            eg += our_eg[new_type][to_sq] - our_eg[piece_type][from_sq]
+            if move.promotion:
+                phase += self.PHASE_WEIGHT[new_type]
+            if piece_type == chess.PAWN:
+                pawn_hash ^= our_keys[chess.PAWN][from_sq]
+                if not move.promotion:
+                    pawn_hash ^= our_keys[chess.PAWN][to_sq]
+
+            captured = board.piece_type_at(to_sq)
+            captured_sq = to_sq
+            if not captured and piece_type == chess.PAWN and to_sq == board.ep_square:
+                # En passant: the captured pawn sits behind the target square
+                captured = chess.PAWN
+                captured_sq = to_sq - 8 if color == chess.WHITE else to_sq + 8
+            if captured:
+                key ^= ZOBRIST_PIECE[not color][captured][captured_sq]
+                mg -= self.PESTO_MG[not color][captured][captured_sq]
+                eg -= self.PESTO_EG[not color][captured][captured_sq]
+                phase -= self.PHASE_WEIGHT[captured]
+                if captured == chess.PAWN:
+                    pawn_hash ^= ZOBRIST_PIECE[not color][chess.PAWN][captured_sq]
+
+        board.push(move)
+
+        key ^= ZOBRIST_CASTLING[board.castling_rights & CASTLING_MASK]
+        if board.ep_square is not None:
+            key ^= ep_key(board)
+        self.key_stack.append(key)
+        self.eval_stack.append((mg, eg, phase))
+        self.pawn_key_stack.append(pawn_hash)
+
+    def push_null(self, board):
+        """
+        Passes the turn (for null-move pruning) and pushes the matching Zobrist key and (unchanged) pawn key and accumulators
+        """
+        key = self.key_stack[-1] ^ ZOBRIST_TURN
+        if board.ep_square is not None:
+            key ^= ep_key(board)
+        board.push(chess.Move.null())
+        self.key_stack.append(key)
+        self.eval_stack.append(self.eval_stack[-1])
+        self.pawn_key_stack.append(self.pawn_key_stack[-1])
+        self.null_indices.append(len(self.key_stack) - 1)
+
+    def pop_move(self, board):
+        """
+        Takes back the last move (or null move) played with push_move/push_null
+        """
+        board.pop()
+        if self.null_indices and self.null_indices[-1] == len(self.key_stack) - 1:
+            self.null_indices.pop()
+        self.key_stack.pop()
+        self.eval_stack.pop()
+        self.pawn_key_stack.pop()
+
+    def is_draw(self, board):
+        """
+        Cheap draw detection for search nodes: fifty-move rule, insufficient material, and repetition of
+        any earlier position on the search path or in the game (a single repetition is scored as a draw)
+        """
+        halfmove_clock = board.halfmove_clock
+        if halfmove_clock >= 100:
+            return True
+
+        # Only positions without pawns, rooks and queens can lack mating material
+        if not (board.pawns | board.rooks | board.queens) and board.is_insufficient_material():
+            return True
+
+        # Repetition: same side to move, so every other position back to the last irreversible move or null move
+        keys = self.key_stack
+        index = len(keys) - 1
+        oldest = index - halfmove_clock
+        if self.null_indices:
+            oldest = max(oldest, self.null_indices[-1])
+        key = keys[index]
+        for i in range(index - 4, max(oldest, 0) - 1, -2):
+            if keys[i] == key:
+                return True
+        return False
+
+    def score_to_tt(self, score, ply):
+        """
+        Mate and tablebase scores count plies from the root; the transposition table stores them relative to the node instead
+        """
+        if score > self.TB_WIN_SCORE - self.MAX_PLY:
+            return score + ply
+        if score < -self.TB_WIN_SCORE + self.MAX_PLY:
+            return score - ply
+        return score
+
+    def score_from_tt(self, score, ply):
+        """
+        Inverse of score_to_tt: converts a stored mate or tablebase score back to plies from the root
+        """
+        if score > self.TB_WIN_SCORE - self.MAX_PLY:
+            return score - ply
+        if score < -self.TB_WIN_SCORE + self.MAX_PLY:
+            return score + ply
+        return score
+
+    def see(self, board, move):
+        """
+        Static exchange evaluation: the material balance (in SEE_VALUES) for the side to move after the capture
+        and the best sequence of recaptures on the target square, each side capturing with its least valuable piece.
+        Sliders hidden behind a capturing piece (x-rays) join in as the pieces in front are removed
+        """
+        from_sq = move.from_square
+        to_sq = move.to_square
+        occupied = board.occupied ^ chess.BB_SQUARES[from_sq]
+
+        # Value of the first capture (en passant removes a pawn from beside the target square)
+        victim = board.piece_type_at(to_sq)
+        if victim is None and board.is_en_passant(move):
+            victim = chess.PAWN
+            occupied ^= chess.BB_SQUARES[to_sq - 8 if board.turn == chess.WHITE else to_sq + 8]
+        gains = [self.SEE_VALUES[victim] if victim else 0]
+
+        piece_on_square = board.piece_type_at(from_sq)
+        if move.promotion:
+            gains[0] += self.SEE_VALUES[move.promotion] - self.SEE_VALUES[chess.PAWN]
+            piece_on_square = move.promotion
+
+        color = not board.turn
+        while True:
+            attackers = board.attackers_mask(color, to_sq, occupied) & occupied
+            if not attackers:
+                break
+
+            # Least valuable attacker recaptures
+            for piece_type in range(1, 7):
+                candidates = attackers & board.pieces_mask(piece_type, color)
+                if candidates:
+                    break
+            gains.append(self.SEE_VALUES[piece_on_square] - gains[-1])
+
+            occupied ^= candidates & -candidates
+            piece_on_square = piece_type
+            color = not color
+
+        # Each side may also stop capturing: negamax the gains back to the first capture
+        for i in range(len(gains) - 1, 0, -1):
+            gains[i - 1] = -max(-gains[i - 1], gains[i])
+        return gains[0]
+
     def order_moves(self, board, tt_best_move, killers):
         """
-        Implements move-ordering heuristic to make pruning efficient. Does it in the following order:
-        1. Transposition table moves first
-        2. MVV-LVA (Most Valuable Victim, Least Valuable Attacker)
+        Implements move-ordering heuristic to make pruning efficient. Moves are generated lazily in stages,
+        so a beta cutoff early on skips generating and scoring the remaining stages:
+        1. Transposition table move (only checked for legality, nothing is generated)
+        2. Captures that don't lose material (by SEE), sorted by MVV-LVA (Most Valuable Victim, Least Valuable Attacker)
         3. Killer moves (a non-capture move that previously caused a beta-cutoff at the same search depth)
-        4. History heuristic moves (those that have frequently caused beta-cutoffs in the past)
-        5. Everything else
+        4. Quiet moves sorted by the history heuristic (those that have frequently caused beta-cutoffs in the past)
+        5. Captures that lose material, sorted by SEE
         """
 
         # Piece values for MVV-LVA heuristic
@@ -361,56 +1560,67 @@ class RAMZPlayer():
 
         # Currently, inputting two killer moves at a time
         killer1, killer2 = killers
-        
-        # Initializing lists
-        captures = []
-        quiet_killers = []
-        quiet_history = []
-        quiet_others = []
 
-        for move in board.legal_moves:
-            # If move is the transposition table best move, yield it
+        # 1. Transposition table move. It comes from a hashed position, so check it is legal here first
+        if tt_best_move is not None and board.is_legal(tt_best_move):
+            yield tt_best_move
+        else:
+            tt_best_move = None
+
+        # 2. Good captures (Highest MVV-LVA scores first). Captures that lose material according to static
+        #    exchange evaluation are held back until after the quiet moves
+        captures = []
+        bad_captures = []
+        for move in board.generate_legal_captures():
             if move == tt_best_move:
-                yield move
                 continue
-            
-            if board.is_capture(move):
-                # === MVV-LVA Heuristic ===
-                # Victim
-                victim = board.piece_at(move.to_square)
-                victim_val = VICTIM_VALUES.get(victim.piece_type, 0) if victim else 1 # En passant = 1
 
-                # Attacker
-                attacker = board.piece_at(move.from_square)
-                attacker_val = ATTACKER_VALUES.get(attacker.piece_type, 0)
+            # === MVV-LVA Heuristic ===
+            # Victim
+            victim_type = board.piece_type_at(move.to_square)
+            victim_val = VICTIM_VALUES[victim_type] if victim_type else 1 # En passant = 1
 
-                # MVV-LVA score
-                score = (victim_val*10) - attacker_val
+            # Attacker
+            attacker_val = ATTACKER_VALUES[board.piece_type_at(move.from_square)]
 
-                captures.append((score, move))
-            
-            elif move == killer1:
-                quiet_killers.append((2, move))
-            elif move == killer2:
-                quiet_killers.append((1, move))
-            else:
-                # History Heuristic
-                h_score = self.history_table[int(board.turn)][move.from_square][move.to_square]
-                quiet_history.append((h_score, move))
+            # Taking a piece worth at least the attacker can't lose material; only the rest need an SEE
+            if victim_val < attacker_val and not move.promotion:
+                see_score = self.see(board, move)
+                if see_score < 0:
+                    bad_captures.append((see_score, move))
+                    continue
+
+            # MVV-LVA score
+            captures.append(((victim_val*10) - attacker_val, move))
 
-        # Sorting and yielding
-        # 1. Captures (Highest MVV-LVA scores first)
         captures.sort(key=lambda x: x[0], reverse=True)
         for _, m in captures: yield m
-        
-        # 2. Killers
-        quiet_killers.sort(key=lambda x: x[0], reverse=True)
-        for _, m in quiet_killers: yield m
-        
-        # 3. History
+
+        # 3. Killers (stored for another position at this ply, so they need a legality check too)
+        for killer in (killer1, killer2 if killer2 != killer1 else None):
+            if killer is not None and killer != tt_best_move and not board.is_capture(killer) and board.is_legal(killer):
+                yield killer
+
+        # 4. Quiet moves, by history. Ordinary captures are excluded through the target mask, en passant by hand
+        quiet_mask = ~board.occupied_co[not board.turn] & chess.BB_ALL
+        ep_square = board.ep_square
+
+        history = self.history_table[int(board.turn)]
+        quiet_history = []
+        for move in board.generate_legal_moves(chess.BB_ALL, quiet_mask):
+            if move == tt_best_move or move == killer1 or move == killer2:
+                continue
+            if move.to_square == ep_square and board.is_en_passant(move):
+                continue
+            quiet_history.append((history[move.from_square][move.to_square], move))
+
         quiet_history.sort(key=lambda x: x[0], reverse=True)
         for _, m in quiet_history: yield m
 
+        # 5. Losing captures, least losing first
+        bad_captures.sort(key=lambda x: x[0], reverse=True)
+        for _, m in bad_captures: yield m
+
     
     def negamax(self, board, alpha, beta, depth_remaining, ply):
         """
@@ -418,92 +1628,191 @@ class RAMZPlayer():
         """
         original_alpha = alpha
 
+        # Polling the clock every few nodes; time.time() is too slow to call at every node
+        self.nodes += 1
+        if not (self.nodes & (self.NODE_CHECK_INTERVAL - 1)):
+            self.check_time()
+
+        # Triangular PV table: this node's line is rebuilt from scratch whenever a move raises alpha
+        self.pv_table[ply] = []
+
+        # Draws by rule or repetition end the line (the root always needs a move)
+        if ply > 0 and self.is_draw(board):
+            return 0, None
+
         # Hashing board for quick lookup of position in transposition table
-        zobrist_key = chess.polyglot.zobrist_hash(board)
-        if zobrist_key in self.transposition_table:
-            entry = self.transposition_table[zobrist_key]
+        zobrist_key = self.key_stack[-1]
+        tt_best_move = None
+        entry = self.transposition_table.probe(zobrist_key)
+        if self.stats is not None:
+            self.stats.tt_probes += 1
+            self.stats.tt_hits += entry is not None
+        if entry is not None:
+            tt_score, tt_depth, tt_flag, tt_best_move = entry
+            tt_score = self.score_from_tt(tt_score, ply)
             
-            if entry['depth'] >= depth_remaining:
-                if entry['flag'] == self.ENTRY_TYPE_EXACT:
-                    return entry['score'], entry['best_move']
-                elif entry['flag'] == self.ENTRY_TYPE_LOWER:
-                    alpha = max(alpha, entry['score']) # Update lower bound
-                elif entry['flag'] == self.ENTRY_TYPE_UPPER:
-                    beta = min(beta, entry['score'])   # Update upper bound
+            # The root is always searched: it needs a move and a PV, and stored scores may come from another path.
+            # PV nodes (open window) are searched as well, so that the triangular PV table gets their full line
+            if tt_depth >= depth_remaining and ply > 0 and beta - alpha == 1:
+                if tt_flag == self.ENTRY_TYPE_EXACT:
+                    return tt_score, tt_best_move
+                elif tt_flag == self.ENTRY_TYPE_LOWER:
+                    alpha = max(alpha, tt_score) # Update lower bound
+                elif tt_flag == self.ENTRY_TYPE_UPPER:
+                    beta = min(beta, tt_score)   # Update upper bound
 
                 # Check for cutoff after updating bounds
                 if alpha >= beta:
-                    return entry['score'], entry['best_move']
-
-        if board.is_game_over():
-
-            if board.turn == self.mycolor:
-                return self.utility(board), None
-            else:
-                base_score = -self.utility(board)
-                if base_score > 90000000:
-                    base_score -= ply 
-                return base_score, None
+                    return tt_score, tt_best_move
+
+        # Tablebase cut: right after a capture or pawn move (where the 50-move counter is zero, as the WDL tables assume),
+        # a position with few enough pieces has a known result and needs no further search
+        if (self.tablebase is not None and ply > 0 and board.halfmove_clock == 0 and not board.castling_rights
+                and chess.popcount(board.occupied) <= self.tb_max_pieces):
+            wdl = self.probe_wdl(board, zobrist_key)
+            if wdl is not None:
+                # Cursed wins and blessed losses are drawn under the 50-move rule
+                if wdl == 2:
+                    tb_score = self.TB_WIN_SCORE - ply
+                elif wdl == -2:
+                    tb_score = -self.TB_WIN_SCORE + ply
+                else:
+                    tb_score = 0
+                self.transposition_table.store(zobrist_key, self.score_to_tt(tb_score, ply), depth_remaining,
+                                               self.ENTRY_TYPE_EXACT, None)
+                if self.stats is not None:
+                    self.stats.tt_stores += 1
+                return tb_score, None
 
         # At depth limit, run quiescence search to circumvent horizon effect
         if depth_remaining <= 0:
-            return self.quiescence(board, alpha, beta), None
+            return self.quiescence(board, alpha, beta, ply), None
+
+        in_check = board.is_check()
+
+        # Pruning near the leaves, based on the static evaluation (never at the root, in check or around mate scores)
+        futile = False
+        if self.use_futility and ply > 0 and not in_check and depth_remaining <= self.REVERSE_FUTILITY_DEPTH:
+            static_eval = self.evaluate(board)
+
+            # Reverse futility pruning: even after giving away a margin per ply, the position still beats beta
+            # (only in null-window nodes; PV nodes need a real score and line)
+            if (beta - alpha == 1 and abs(beta) < self.TB_WIN_SCORE - self.MAX_PLY
+                    and static_eval - self.REVERSE_FUTILITY_MARGIN * depth_remaining >= beta):
+                return static_eval - self.REVERSE_FUTILITY_MARGIN * depth_remaining, None
+
+            # Futility pruning: quiet moves can't lift a position this far below alpha (applied in the move loop)
+            if depth_remaining < len(self.FUTILITY_MARGIN) and abs(alpha) < self.TB_WIN_SCORE - self.MAX_PLY:
+                futile = static_eval + self.FUTILITY_MARGIN[depth_remaining] <= alpha
 
         # Null-Move Pruning: Make a null move and prune if position is still good
-        if depth_remaining >= 3 and not board.is_check() and ply > 0:
+        if depth_remaining >= 3 and not in_check and ply > 0:
             # Making the null move (i.e. skipping my turn)
             occupied = board.occupied_co[board.turn]
-            kings = int(board.pieces(chess.KING, board.turn))
-            pawns = int(board.pieces(chess.PAWN, board.turn))
+            kings = board.pieces_mask(chess.KING, board.turn)
+            pawns = board.pieces_mask(chess.PAWN, board.turn)
             
             # Removes kings and pawns from the count to avoid Zugzwangs, which null-move pruning is prone to
             has_major_pieces = (occupied & ~kings & ~pawns) != 0
             if has_major_pieces:
-                board.push(chess.Move.null())
+                self.push_null(board)
                 R = 2
-                score, _ = self.negamax(board, -beta, -beta + 1, depth_remaining - 1 - R, ply + 1)
-                board.pop()
+                # The null-move subtree is not on the previous PV, so it must not pick up its moves
+                following_pv = self.follow_pv
+                self.follow_pv = False
+                score = -self.negamax(board, -beta, -beta + 1, depth_remaining - 1 - R, ply + 1)[0]
+                self.follow_pv = following_pv
+                self.pop_move(board)
                 if score >= beta:
+                    if self.stats is not None:
+                        self.stats.null_move_cutoffs += 1
                     return beta, None
 
         v = float("-inf")
         best_move = None
 
-        tt_best_move = None
-
-        if zobrist_key in self.transposition_table:
-            tt_best_move = self.transposition_table[zobrist_key].get('best_move')
-
         current_killers = self.killer_moves[ply]
 
+        # While still on the previous iteration's PV, its move at this ply is searched first (ahead of the TT move,
+        # which may have been overwritten). The PV is only followed down its first branch
+        if self.follow_pv:
+            if ply < len(self.previous_pv):
+                tt_best_move = self.previous_pv[ply]
+            else:
+                self.follow_pv = False
+
         ordered_moves = self.order_moves(board, tt_best_move, current_killers)
+        history = self.history_table[int(board.turn)]
+        moves_searched = 0
     
         for move in ordered_moves:
-            board.push(move)
+            is_quiet = not move.promotion and not board.is_capture(move)
+            self.push_move(board, move)
+            moves_searched += 1
+            gives_check = board.is_check()
+
+            # Futility pruning: skip quiet, non-checking moves in a hopeless frontier node (but always search one move)
+            if futile and moves_searched > 1 and is_quiet and not gives_check:
+                self.pop_move(board)
+                continue
 
-            v2_opponent, _ = self.negamax(board, -beta, -alpha, depth_remaining-1, ply + 1)
-            v2 = -v2_opponent
+            # Late move reductions: quiet moves late in the ordering rarely matter, so search them shallower.
+            # Moves with a good cutoff history are reduced less
+            reduction = 0
+            if (self.use_lmr and depth_remaining >= self.LMR_MIN_DEPTH and moves_searched > self.LMR_MIN_MOVES
+                    and is_quiet and not in_check and not gives_check and move not in current_killers):
+                reduction = 1 if moves_searched <= self.LMR_LATE_MOVES else 2
+                if history[move.from_square][move.to_square] > depth_remaining * depth_remaining:
+                    reduction -= 1
+                reduction = min(reduction, depth_remaining - 2)
+
+            # Principal variation search: the first move gets the full window. The rest are expected to be worse,
+            # so a null window only proves that; a move that beats alpha anyway is re-searched with the full window
+            if moves_searched == 1:
+                v2 = -self.negamax(board, -beta, -alpha, depth_remaining-1, ply + 1)[0]
+            else:
+                v2 = -self.negamax(board, -alpha - 1, -alpha, depth_remaining-1-reduction, ply + 1)[0]
+                # A reduced move that beats alpha is verified at full depth first
+                if reduction and v2 > alpha:
+                    v2 = -self.negamax(board, -alpha - 1, -alpha, depth_remaining-1, ply + 1)[0]
+                if alpha < v2 < beta:
+                    v2 = -self.negamax(board, -beta, -alpha, depth_remaining-1, ply + 1)[0]
 
-            board.pop()
+            self.pop_move(board)
+            self.follow_pv = False
 
             if v2 > v:
                 v = v2
                 best_move = move
+                if v > alpha:
+                    self.pv_table[ply] = [move] + self.pv_table[ply + 1]
+                    # Remembering root moves proven better than alpha in case this iteration gets aborted
+                    # (a fail-low move only has an upper bound and proves nothing)
+                    if ply == 0:
+                        self.root_best_move = move
                 alpha = max(alpha, v)
             
             if v >= beta:
+                if self.stats is not None:
+                    self.stats.beta_cutoffs += 1
+                    self.stats.first_move_cutoffs += moves_searched == 1
+
                 if not board.is_capture(move) and not move.promotion:
                     if move != self.killer_moves[ply][0]:
                         self.killer_moves[ply][1] = self.killer_moves[ply][0] # Shift old move
                         self.killer_moves[ply][0] = move                     # Add new move
 
-                    # Getting the color of the player who just moved
-                    color_index = 0 if board.turn == chess.WHITE else 1
+                    # Getting the color of the player who just moved (same indexing as order_moves)
+                    color_index = int(board.turn)
                     reward = depth_remaining * depth_remaining
                     self.history_table[color_index][move.from_square][move.to_square] += reward
                 
                 break
 
+        # No legal moves: checkmate or stalemate
+        if moves_searched == 0:
+            return (-self.MATE_SCORE + ply if in_check else 0), None
+
         if v <= original_alpha:
             flag = self.ENTRY_TYPE_UPPER # Failed low
         elif v >= beta:
@@ -511,33 +1820,55 @@ class RAMZPlayer():
         else:
             flag = self.ENTRY_TYPE_EXACT # Exact score
             
-        entry = {
-            'score': v,
-            'depth': depth_remaining,
-            'flag': flag,
-            'best_move': best_move
-        }
-        self.transposition_table[zobrist_key] = entry
+        self.transposition_table.store(zobrist_key, self.score_to_tt(v, ply), depth_remaining, flag, best_move)
+        if self.stats is not None:
+            self.stats.tt_stores += 1
         return v, best_move
 
-    def quiescence(self, board, alpha, beta):
+    def quiescence(self, board, alpha, beta, ply):
         """
         Implements quiescence search
         """
-        # 1. Baseline score: if I don't capture anything, how well am I doing?
-        stand_pat = self.utility(board)
-        if board.turn != self.mycolor:
-            stand_pat = -stand_pat
+        self.nodes += 1
+        if not (self.nodes & (self.NODE_CHECK_INTERVAL - 1)):
+            self.check_time()
+        if self.stats is not None:
+            self.stats.qnodes += 1
+
+        # 1. Transposition table: any stored entry (quiescence entries have depth QS_TT_DEPTH, main search entries more)
+        # is deep enough here. Bounds that decide the node return at once; otherwise its capture is tried first
+        original_alpha = alpha
+        zobrist_key = self.key_stack[-1]
+        tt_move = None
+        entry = self.transposition_table.probe(zobrist_key)
+        if self.stats is not None:
+            self.stats.tt_probes += 1
+            self.stats.tt_hits += entry is not None
+        if entry is not None:
+            tt_score, _, tt_flag, tt_move = entry
+            tt_score = self.score_from_tt(tt_score, ply)
+            if (tt_flag == self.ENTRY_TYPE_EXACT
+                    or (tt_flag == self.ENTRY_TYPE_LOWER and tt_score >= beta)
+                    or (tt_flag == self.ENTRY_TYPE_UPPER and tt_score <= alpha)):
+                return tt_score
+
+        # 2. Baseline score: if I don't capture anything, how well am I doing? (Finished games score as such)
+        if self.is_draw(board):
+            return 0
+        if board.is_check() and not any(board.generate_legal_moves()):
+            return -self.MATE_SCORE + ply
+        stand_pat = self.evaluate(board)
         
         # If even doing nothing is too good for opponent to allow, it's a safe quiescence cutoff
         if stand_pat >= beta:
+            self.store_quiescence(zobrist_key, stand_pat, self.ENTRY_TYPE_LOWER, None, ply)
             return stand_pat
 
-        # 2. Delta Pruning: even if I win with the biggest possible material, can the agent still reach alpha?
+        # 3. Delta Pruning: even if I win with the biggest possible material, can the agent still reach alpha?
         BIG_DELTA = 1050 # 900 (Queen) + 150 (Safety buffer)
-        pawns = board.pieces(chess.PAWN, board.turn)
+        pawns = board.pieces_mask(chess.PAWN, board.turn)
 
-        # 3. Taking note of paws with possibility of promoting; delta pruning is unsafe if promotions are possible
+        # 4. Taking note of paws with possibility of promoting; delta pruning is unsafe if promotions are possible
         if board.turn == chess.WHITE:
             promoters = pawns & chess.BB_RANK_7
         else:
@@ -551,105 +1882,163 @@ class RAMZPlayer():
         if alpha < stand_pat:
             alpha = stand_pat
 
-        # 4. For quiescence search, agent looks at forcing moves only
+        # 5. For quiescence search, agent looks at forcing moves only
         captures = [
             m for m in board.legal_moves 
             if board.is_capture(m) or m.promotion
         ]
         
-        # 5. Capture ordering using simple MVV sorting
+        # 6. Capture ordering using simple MVV sorting, with the transposition table's capture first
         VICTIM_VALUES = {chess.PAWN: 1, chess.KNIGHT: 3, chess.BISHOP: 3, chess.ROOK: 5, chess.QUEEN: 9, chess.KING: 0}
         def cap_score(move):
-            victim = board.piece_at(move.to_square)
-            if victim: return VICTIM_VALUES.get(victim.piece_type, 0)
+            if move == tt_move: return 100
+            victim = board.piece_type_at(move.to_square)
+            if victim: return VICTIM_VALUES.get(victim, 0)
             return 0
             
         captures.sort(key=cap_score, reverse=True)
 
-        # 6. Recursive quiescence search: tree ends when no captures exist
+        # 7. Recursive quiescence search: tree ends when no captures exist
+        best_move = None
         for move in captures:
-            board.push(move)
-            score = -self.quiescence(board, -beta, -alpha)
-            board.pop()
+            # Captures that lose material in the exchange (QxP defended by a pawn, ...) are not worth a look
+            if not move.promotion and move != tt_move and self.see(board, move) < 0:
+                continue
+
+            self.push_move(board, move)
+            score = -self.quiescence(board, -beta, -alpha, ply + 1)
+            self.pop_move(board)
 
             if score >= beta:
+                self.store_quiescence(zobrist_key, score, self.ENTRY_TYPE_LOWER, move, ply)
                 return beta
             if score > alpha:
                 alpha = score
+                best_move = move
 
+        flag = self.ENTRY_TYPE_EXACT if alpha > original_alpha else self.ENTRY_TYPE_UPPER
+        self.store_quiescence(zobrist_key, alpha, flag, best_move, ply)
         return alpha
 
-    def utility(self, board):
+    def store_quiescence(self, zobrist_key, score, flag, best_move, ply):
         """
-        Calculates utility function score for given position
+        Stores a quiescence result in the transposition table at depth QS_TT_DEPTH, below every main search entry
+        """
+        self.transposition_table.store(zobrist_key, self.score_to_tt(score, ply), self.QS_TT_DEPTH, flag, best_move)
+        if self.stats is not None:
+            self.stats.tt_stores += 1
+
+    def terminal_utility(self, board):
+        """
+        Returns the utility of a finished game (checkmate or draw) from the agent's perspective, or None if the game goes on.
+        Used outside the search only; search nodes use is_draw() and the move loop instead
         """
-        # 1. Terminal node checks first (checkmate and stalemate)
         if board.is_checkmate():
-            return -99999999 if board.turn == self.mycolor else 99999999
+            return -self.MATE_SCORE if board.turn == self.mycolor else self.MATE_SCORE
 
         if board.is_stalemate() or board.is_insufficient_material() or board.can_claim_draw():
             return 0
 
-        # 2. Game phase calculation using PeSTO tapering
-        phase = 0
-        phase += len(board.pieces(chess.KNIGHT, chess.WHITE)) * 1
-        phase += len(board.pieces(chess.KNIGHT, chess.BLACK)) * 1
-        phase += len(board.pieces(chess.BISHOP, chess.WHITE)) * 1
-        phase += len(board.pieces(chess.BISHOP, chess.BLACK)) * 1
-        phase += len(board.pieces(chess.ROOK, chess.WHITE)) * 2
-        phase += len(board.pieces(chess.ROOK, chess.BLACK)) * 2
-        phase += len(board.pieces(chess.QUEEN, chess.WHITE)) * 4
-        phase += len(board.pieces(chess.QUEEN, chess.BLACK)) * 4
-        phase = min(phase, 24) 
+        return None
 
-        # Calculating middlegame and endgame scores to be blended later
+    def pesto_accumulators(self, board):
+        """
+        Computes the PeSTO middlegame score, endgame score (both from White's perspective, material + PST)
+        and game phase of a position from scratch. During search these are kept up to date by push_move instead
+        """
         mg_score = 0
         eg_score = 0
-
+        phase = 0
+        for pt in range(1, 7):
+            for color in (chess.WHITE, chess.BLACK):
+                mg_table = self.PESTO_MG[color][pt]
+                eg_table = self.PESTO_EG[color][pt]
+                for sq in self.iter_bits(board.pieces_mask(pt, color)):
+                    mg_score += mg_table[sq]
+                    eg_score += eg_table[sq]
+                    phase += self.PHASE_WEIGHT[pt]
+        return mg_score, eg_score, phase
+
+    def passed_pawn_score(self, board):
+        """
+        Returns the (middlegame, endgame) passed-pawn bonus from White's perspective
+        """
         # Pre-fetching pawn bitboards as integers for fast bitwise math
-        white_pawns_int = int(board.pieces(chess.PAWN, chess.WHITE))
-        black_pawns_int = int(board.pieces(chess.PAWN, chess.BLACK))
+        white_pawns_int = board.pawns & board.occupied_co[chess.WHITE]
+        black_pawns_int = board.pawns & board.occupied_co[chess.BLACK]
 
         # Defining bonuses to encourage passed pawns
         PASSED_MG = 20  # Small bonus in middlegame
         PASSED_EG = 50  # Big bonus in endgame (passed pawns are dangerous!)
-        
-        # 3. Iterating over pieces and summing up values
-        for pt in range(1, 7):
 
-            # Getting material values from PeSTO tuple dictionary
-            mg_val, eg_val = MATERIAL_PESTO[pt]
+        mg_score = 0
+        eg_score = 0
 
-            # Looping through White's pieces
-            bb_w = board.pieces(pt, chess.WHITE)
-            for sq in self.iter_bits(bb_w):
-                mg_score += mg_val + self.PST_MG_WHITE[pt][sq]
-                eg_score += eg_val + self.PST_EG_WHITE[pt][sq]
-
-                # Passed Pawn Check for White
-                if pt == chess.PAWN:
-                    if (self.PASSED_PAWN_MASK[chess.WHITE][sq] & black_pawns_int) == 0:
-                        rank = chess.square_rank(sq)
-                        # Scaling bonus by rank (closer to 8 = better)
-                        w_bonus = PASSED_EG + (rank * 10) 
-                        
-                        mg_score += PASSED_MG
-                        eg_score += w_bonus
-
-            # Looping through Black's pieces
-            bb_b = board.pieces(pt, chess.BLACK)
-            for sq in self.iter_bits(bb_b):
-                mg_score -= mg_val + self.PST_MG_BLACK[pt][sq]
-                eg_score -= eg_val + self.PST_EG_BLACK[pt][sq]
-
-                if pt == chess.PAWN:
-                    if (self.PASSED_PAWN_MASK[chess.BLACK][sq] & white_pawns_int) == 0:
-                        # Scaling bonus by rank (closer to 1 = better for Black)
-                        rank = 7 - chess.square_rank(sq)
-                        b_bonus = PASSED_EG + (rank * 10)
-                        
-                        mg_score -= PASSED_MG
-                        eg_score -= b_bonus
+        # Passed Pawn Check for White
+        for sq in self.iter_bits(white_pawns_int):
+            if (self.PASSED_PAWN_MASK[chess.WHITE][sq] & black_pawns_int) == 0:
+                # Scaling bonus by rank (closer to 8 = better)
+                rank = chess.square_rank(sq)
+                mg_score += PASSED_MG
+                eg_score += PASSED_EG + (rank * 10)
+
+        # Passed Pawn Check for Black
+        for sq in self.iter_bits(black_pawns_int):
+            if (self.PASSED_PAWN_MASK[chess.BLACK][sq] & white_pawns_int) == 0:
+                # Scaling bonus by rank (closer to 1 = better for Black)
+                rank = 7 - chess.square_rank(sq)
+                mg_score -= PASSED_MG
+                eg_score -= PASSED_EG + (rank * 10)
+
+        return mg_score, eg_score
+
+    def pawn_structure_score(self, board):
+        """
+        Returns the (middlegame, endgame) pawn-structure score from White's perspective, looked up in the pawn hash
+        table by the current pawn key and only computed on a miss. Every term that depends on the pawns alone
+        (passed pawns now; doubled or isolated pawns would go here too) belongs in this cached score
+        """
+        key = self.pawn_key_stack[-1]
+        score = self.pawn_hash_table.probe(key)
+        if self.stats is not None:
+            self.stats.pawn_probes += 1
+            self.stats.pawn_hits += score is not None
+        if score is None:
+            score = self.passed_pawn_score(board)
+            self.pawn_hash_table.store(key, score)
+        return score
+
+    def evaluate(self, board):
+        """
+        Tapered PeSTO evaluation from the side to move's perspective, read from the incrementally updated
+        accumulators. Same score as utility() for non-terminal positions, without rescanning the board
+        """
+        mg_score, eg_score, phase = self.eval_stack[-1]
+        pawn_mg, pawn_eg = self.pawn_structure_score(board)
+        mg_score += pawn_mg
+        eg_score += pawn_eg
+        phase = min(phase, 24)
+
+        final_score = ( (mg_score * phase) + (eg_score * (24 - phase)) ) // 24
+        return final_score if board.turn == chess.WHITE else -final_score
+
+    def utility(self, board):
+        """
+        Calculates utility function score for given position
+        """
+        # 1. Terminal node checks first (checkmate and stalemate)
+        terminal_score = self.terminal_utility(board)
+        if terminal_score is not None:
+            return terminal_score
+
+        # 2. Summing up material and piece-square values, and the game phase used for PeSTO tapering
+        mg_score, eg_score, phase = self.pesto_accumulators(board)
+        phase = min(phase, 24) 
+
+        # 3. Adding bonuses for passed pawns
+        passed_mg, passed_eg = self.passed_pawn_score(board)
+        mg_score += passed_mg
+        eg_score += passed_eg
 
         # 4. Tapered PeSTO evaluation formula
         final_score = ( (mg_score * phase) + (eg_score * (24 - phase)) ) // 24
@@ -659,6 +2048,28 @@ class RAMZPlayer():
         else:
             return -final_score
     
+def smp_helper_main(index, tt_buffer, hash_mb, tasks, done, stop_event):
+    """
+    Entry point of a Lazy SMP helper process. Searches every position it is sent into the shared
+    transposition table until told to stop; its own results are discarded. Odd-numbered helpers start one
+    ply deeper, so helpers spread over neighbouring depths instead of duplicating the main search
+    """
+    player = RAMZPlayer(chess.WHITE, 1, 0, None, None, hash_mb=0)
+    player.transposition_table = TranspositionTable(hash_mb, buffer=tt_buffer)
+    player.stop_event = stop_event
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        board, mycolor, depth_limit, hard_deadline, generation = task
+        player.mycolor = mycolor
+        player.transposition_table.generation = generation
+        try:
+            player.search(board, depth_limit, float("inf"), hard_deadline, start_depth=1 + index % 2)
+        finally:
+            done.put(index)
+
 class StockfishPlayer:
     """
     Implements standard Stockfish engine for use in tests
@@ -667,6 +2078,7 @@ class StockfishPlayer:
         self.color = color
         self.time_limit = time_limit
         self.depth_limit = depth_limit # Store the depth limit
+        self.game = object()           # Identifies the current game to the engine
         try:
             self.engine = chess.engine.SimpleEngine.popen_uci(path)
             self.engine.configure({"UCI_LimitStrength": True, "UCI_Elo": elo})
@@ -676,9 +2088,17 @@ class StockfishPlayer:
     def get_color(self):
         return self.color
 
+    def new_game(self, color=None):
+        """
+        Starts a new game with the same engine process: a new game key makes python-chess send "ucinewgame"
+        """
+        if color is not None:
+            self.color = color
+        self.game = object()
+
     def make_move(self, board):
         limit = chess.engine.Limit(time=self.time_limit, depth=self.depth_limit)
-        result = self.engine.play(board, limit)
+        result = self.engine.play(board, limit, game=self.game)
         return result.move
 
     def close(self):
@@ -0,0 +1,220 @@
+import chess
+import sys
+import os
+import time
+import threading
+from players import RAMZPlayer
+
+# ================= CONFIGURATION =================
+ENGINE_NAME = "RAM-Z"
+ENGINE_AUTHOR = "Ramzi Sharawi"
+DEFAULT_BOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_books", "gm2600.bin")
+
+DEFAULT_HASH = 16           # MB
+DEFAULT_THREADS = 1
+DEFAULT_MOVE_TIME = 5.0     # Seconds per move when "go" gives neither a clock nor a move time
+TB_WIN_CP = 20000           # Centipawns reported for a tablebase win at the root
+TB_MAX_PLY = 1000           # Tablebase scores lie within this many plies of RAMZPlayer.TB_WIN_SCORE
+# =================================================
+
+def uci_score(score):
+    """
+    Converts a search score (side to move's perspective) to a UCI "score" field. Mates (99999999 - plies) become
+    "mate <moves>", tablebase wins (80000000 - plies) a bounded "cp" value of TB_WIN_CP - plies
+    """
+    if abs(score) > 90000000:
+        plies = max(99999999 - abs(score), 1)
+        moves = (plies + 1) // 2
+        return f"mate {moves if score > 0 else -moves}"
+    if abs(score) > 80000000 - TB_MAX_PLY:
+        cp = TB_WIN_CP - (80000000 - abs(score))
+        return f"cp {cp if score > 0 else -cp}"
+    return f"cp {int(score)}"
+
+class UCIEngine():
+    """
+    Universal Chess Interface front end for RAMZPlayer. Commands are read from stdin on the main thread,
+    while searches run on a background thread so that "stop" (and "isready") are answered immediately.
+    """
+    def __init__(self):
+        self.options = {
+            'Hash': DEFAULT_HASH,
+            'Threads': DEFAULT_THREADS,
+            'SyzygyPath': '',
+            'OwnBook': True,
+        }
+        self.player = None
+        self.board = chess.Board()
+        self.search_thread = None
+        self.stop_event = threading.Event()
+        self.search_start = 0.0
+
+    def send(self, line):
+        print(line, flush=True)
+
+    # --- Player management ---
+
+    def get_player(self):
+        """
+        Returns the player, creating it from the current options if they changed since the last search
+        """
+        if self.player is None:
+            self.player = RAMZPlayer(
+                mycolor=self.board.turn,
+                depth_limit=4,
+                time_limit=DEFAULT_MOVE_TIME,
+                opening_book_path=DEFAULT_BOOK if self.options['OwnBook'] else None,
+                syzygy_path=self.options['SyzygyPath'] or None,
+                hash_mb=self.options['Hash'],
+                workers=self.options['Threads']
+            )
+            self.player.stop_event = self.stop_event
+            self.player.on_iteration = self.send_info
+        return self.player
+
+    def reset_player(self):
+        if self.player is not None:
+            self.player.close()
+            self.player = None
+
+    # --- Command handlers ---
+
+    def cmd_uci(self):
+        self.send(f"id name {ENGINE_NAME}")
+        self.send(f"id author {ENGINE_AUTHOR}")
+        self.send(f"option name Hash type spin default {DEFAULT_HASH} min 1 max 4096")
+        self.send(f"option name Threads type spin default {DEFAULT_THREADS} min 1 max 64")
+        self.send("option name SyzygyPath type string default <empty>")
+        self.send("option name OwnBook type check default true")
+        self.send("uciok")
+
+    def cmd_setoption(self, tokens):
+        # setoption name <name> [value <value>]
+        if "name" not in tokens:
+            return
+        name_end = tokens.index("value") if "value" in tokens else len(tokens)
+        name = " ".join(tokens[tokens.index("name") + 1:name_end])
+        value = " ".join(tokens[name_end + 1:])
+
+        if name == 'Hash' or name == 'Threads':
+            self.options[name] = max(1, int(value))
+        elif name == 'SyzygyPath':
+            self.options[name] = '' if value in ('', '<empty>') else value
+        elif name == 'OwnBook':
+            self.options[name] = value.lower() == 'true'
+        else:
+            self.send(f"info string unknown option {name}")
+            return
+
+        # Options take effect on the next search
+        self.reset_player()
+
+    def cmd_position(self, tokens):
+        # position [startpos | fen <fen>] [moves <move1> ... <moveN>]
+        moves_index = tokens.index("moves") if "moves" in tokens else len(tokens)
+        if tokens and tokens[0] == "fen":
+            board = chess.Board(" ".join(tokens[1:moves_index]))
+        else:
+            board = chess.Board()
+
+        for uci_move in tokens[moves_index + 1:]:
+            board.push_uci(uci_move)
+        self.board = board
+
+    def cmd_go(self, tokens):
+        # go [wtime <ms>] [btime <ms>] [winc <ms>] [binc <ms>] [movetime <ms>] [depth <n>] [infinite]
+        params = {}
+        i = 0
+        while i < len(tokens):
+            if tokens[i] == "infinite":
+                params["infinite"] = True
+            elif i + 1 < len(tokens) and tokens[i] in ("wtime", "btime", "winc", "binc", "movetime", "depth"):
+                params[tokens[i]] = int(tokens[i + 1])
+                i += 1
+            i += 1
+
+        self.stop_search()
+        self.stop_event.clear()
+        player = self.get_player()
+        self.search_thread = threading.Thread(target=self.run_search, args=(player, self.board.copy(), params), daemon=True)
+        self.search_thread.start()
+
+    def run_search(self, player, board, params):
+        """
+        Body of the search thread: runs make_move under the limits of the "go" command and reports bestmove
+        """
+        player.mycolor = board.turn
+        player.depth_limit = min(params.get("depth", player.MAX_PLY), player.MAX_PLY)
+
+        time_limit = float("inf")
+        clock = None
+        increment = 0.0
+        if "movetime" in params:
+            time_limit = params["movetime"] / 1000
+        elif not params.get("infinite"):
+            clock_key, inc_key = ("wtime", "winc") if board.turn == chess.WHITE else ("btime", "binc")
+            if clock_key in params:
+                clock = params[clock_key] / 1000
+                increment = params.get(inc_key, 0) / 1000
+            elif "depth" not in params:
+                time_limit = DEFAULT_MOVE_TIME
+
+        self.search_start = time.time()
+        try:
+            best_move = player.make_move(board, time_limit=time_limit, clock=clock, increment=increment)
+        except Exception as e:
+            self.send(f"info string search error: {e}")
+            best_move = next(iter(board.legal_moves), None)
+
+        # In infinite mode bestmove may only be sent after "stop"
+        if params.get("infinite"):
+            self.stop_event.wait()
+
+        self.send(f"bestmove {best_move.uci() if best_move else '0000'}")
+
+    def send_info(self, depth, score, pv, nodes):
+        elapsed = max(time.time() - self.search_start, 1e-6)
+        pv = " ".join(move.uci() for move in pv if move)
+        hashfull = self.player.transposition_table.hashfull()
+        self.send(f"info depth {depth} score {uci_score(score)} nodes {nodes} nps {int(nodes / elapsed)} "
+                  f"hashfull {hashfull} time {int(elapsed * 1000)} pv {pv}")
+
+    def stop_search(self):
+        """
+        Aborts the running search, if any, and waits for its bestmove
+        """
+        if self.search_thread is not None:
+            self.stop_event.set()
+            self.search_thread.join()
+            self.search_thread = None
+
+    def loop(self, stream=sys.stdin):
+        for line in stream:
+            tokens = line.strip().split()
+            if not tokens:
+                continue
+            command, args = tokens[0], tokens[1:]
+
+            if command == "uci":
+                self.cmd_uci()
+            elif command == "isready":
+                self.send("readyok")
+            elif command == "setoption":
+                self.cmd_setoption(args)
+            elif command == "ucinewgame":
+                self.stop_search()
+                self.reset_player()
+            elif command == "position":
+                self.cmd_position(args)
+            elif command == "go":
+                self.cmd_go(args)
+            elif command == "stop":
+                self.stop_search()
+            elif command == "quit":
+                break
+
+        self.stop_search()
+        self.reset_player()
+
+if __name__ == "__main__":
+    UCIEngine().loop()
@@ -8,6 +8,8 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+import multiprocessing.util
+from concurrent.futures import ProcessPoolExecutor, as_completed
 # ================= CONFIGURATION =================
 DEFAULT_STOCKFISH = r"stockfish\stockfish-windows-x86-64-avx2.exe"
 DEFAULT_BOOK = r"opening_books\gm2600.bin"
@@ -23,6 +25,10 @@ DEFAULT_TIME_LIMIT  = 5.0        # Both have 10 seconds per move max
 PLOT_FOLDER = "report_plots"     # Folder in which plots will be saved
 # =================================================
 
+# Players of this process, kept between games: {(slot, agent type): player}. Each process (the main one or a
+# pool worker) starts its agents and Stockfish engines once and resets them with new_game() between games
+player_pool = {}
+
 # Function to predict the game phase at which the game finished.
 def get_game_phase(board):
     """
@@ -68,7 +74,9 @@ def create_player(agent_type, color, args):
             depth_limit=args.depth,
             time_limit=args.time,
             opening_book_path=DEFAULT_BOOK,
-            syzygy_path=None
+            syzygy_path=None,
+            workers=args.workers,
+            ponder=args.ponder
         )
     elif agent_type == 'stockfish':
         return StockfishPlayer(
@@ -84,6 +92,38 @@ def create_player(agent_type, color, args):
         raise ValueError(f"Unknown agent type: {agent_type}")
 
 
+def get_player(slot, agent_type, color, args):
+    """
+    Returns this process's player for the given slot ('p1' or 'p2'), reset for a new game as the given color.
+    The player is created on first use
+    """
+    key = (slot, agent_type)
+    player = player_pool.get(key)
+    if player is None:
+        player = create_player(agent_type, color, args)
+        player_pool[key] = player
+    else:
+        player.new_game(color)
+    return player
+
+def close_players():
+    """
+    Closes every pooled player (stopping the Stockfish processes)
+    """
+    for player in player_pool.values():
+        if hasattr(player, 'close'):
+            try:
+                player.close()
+            except Exception as e:
+                print(f"Error closing player: {e}")
+    player_pool.clear()
+
+def init_worker():
+    """
+    Pool worker initializer: closes the worker's pooled players when it shuts down
+    """
+    multiprocessing.util.Finalize(None, close_players, exitpriority=10)
+
 def play_game(game_id, p1_type, p2_type, p1_plays_white, args):
     board = chess.Board()
     
@@ -91,9 +131,9 @@ def play_game(game_id, p1_type, p2_type, p1_plays_white, args):
     p1_color = chess.WHITE if p1_plays_white else chess.BLACK
     p2_color = chess.BLACK if p1_plays_white else chess.WHITE
 
-    # Instantiate Players
-    player1 = create_player(p1_type, p1_color, args)
-    player2 = create_player(p2_type, p2_color, args)
+    # Fetch Players from the pool (created on first use, reset for this game afterwards)
+    player1 = get_player('p1', p1_type, p1_color, args)
+    player2 = get_player('p2', p2_type, p2_color, args)
 
     white_player = player1 if p1_plays_white else player2
     black_player = player2 if p1_plays_white else player1
@@ -108,10 +148,6 @@ def play_game(game_id, p1_type, p2_type, p1_plays_white, args):
         
         board.push(move)
 
-    # Cleanup (Important for Stockfish processes)
-    if hasattr(player1, 'close'): player1.close()
-    if hasattr(player2, 'close'): player2.close()
-
     # Determine Winner
     result = board.result()
     if result == "1/2-1/2":
@@ -135,6 +171,36 @@ def play_game(game_id, p1_type, p2_type, p1_plays_white, args):
         "Phase": phase
     }
 
+def run_games(args):
+    """
+    Plays every game of the match and yields each game's data as soon as it finishes.
+    With --jobs > 1 games run in a process pool (each worker keeps its own players and Stockfish processes
+    for all of its games), so results arrive in completion order. Game IDs and colors are fixed up front: Player 1 plays White in even games.
+    """
+    schedule = [(i, i % 2 == 0) for i in range(args.games)]
+
+    if args.jobs <= 1:
+        try:
+            for i, p1_plays_white in schedule:
+                try:
+                    yield play_game(i, args.agent1, args.agent2, p1_plays_white, args)
+                except Exception as e:
+                    print(f"CRASH in Game {i+1}: {e}")
+        finally:
+            close_players()
+        return
+
+    with ProcessPoolExecutor(max_workers=args.jobs, initializer=init_worker) as pool:
+        futures = {
+            pool.submit(play_game, i, args.agent1, args.agent2, p1_plays_white, args): i
+            for i, p1_plays_white in schedule
+        }
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                print(f"CRASH in Game {futures[future]+1}: {e}")
+
 def generate_plots(df, p1_name, p2_name):
     if not os.path.exists(PLOT_FOLDER):
         os.makedirs(PLOT_FOLDER)
@@ -191,11 +257,20 @@ def main():
     parser.add_argument('--depth', type=int, default=DEFAULT_DEPTH_LIMIT, help="Depth limit for agents")
     parser.add_argument('--time', type=float, default=DEFAULT_TIME_LIMIT, help="Time limit (seconds) per move")
     parser.add_argument('--elo', type=int, default=DEFAULT_STOCKFISH_ELO, help="Elo for Stockfish (if used)")
+    parser.add_argument('--workers', type=int, default=1, help="Search processes per RAM-Z agent (Lazy SMP)")
+    parser.add_argument('--jobs', type=int, default=1, help="Number of games to play in parallel")
+    parser.add_argument('--ponder', action='store_true', help="Let RAM-Z agents think on the opponent's time")
     
     args = parser.parse_args()
 
+    # A ponder thread runs in the agent's own process and would slow down a RAM-Z opponent sharing it,
+    # so pondering is only allowed against Stockfish, which searches in a process of its own
+    if args.ponder and 'stockfish' not in (args.agent1, args.agent2):
+        print("--ponder is only supported against Stockfish; playing without pondering")
+        args.ponder = False
+
     print(f"--- STARTING MATCH: {args.agent1.title()} vs {args.agent2.title()} ---")
-    print(f"Settings: {args.games} Games | Time: {args.time}s | Depth: {args.depth} | SF Elo: {args.elo}")
+    print(f"Settings: {args.games} Games | Time: {args.time}s | Depth: {args.depth} | SF Elo: {args.elo} | Jobs: {args.jobs}")
     
     match_data = []
     p1_wins = 0
@@ -203,24 +278,18 @@ def main():
     draws = 0
     start_time = time.time()
 
-    for i in range(args.games):
-        # Alternate who plays white
-        p1_plays_white = (i % 2 == 0)
-        
-        try:
-            data = play_game(i, args.agent1, args.agent2, p1_plays_white, args)
-            match_data.append(data)
-
-            if data["Winner"] == args.agent1.title():
-                p1_wins += 1
-            elif data["Winner"] == args.agent2.title():
-                p2_wins += 1
-            else:
-                draws += 1
-                
-        except Exception as e:
-            print(f"CRASH in Game {i+1}: {e}")
-            continue
+    for data in run_games(args):
+        match_data.append(data)
+
+        if data["Winner"] == args.agent1.title():
+            p1_wins += 1
+        elif data["Winner"] == args.agent2.title():
+            p2_wins += 1
+        else:
+            draws += 1
+
+    # Parallel games finish out of order; keep the CSV in game order
+    match_data.sort(key=lambda data: data["Game_ID"])
 
     total_time = time.time() - start_time
     